@@ -1,6 +1,19 @@
+import re
+
 import numpy as np
+import pytest
 from PIL import Image
-from vectorvision.Converter import Converter, create_svg
+from vectorvision.Converter import (
+    Converter,
+    _ImageMask,
+    create_svg,
+    histogram_layers,
+    is_bilevel,
+    layer_opacity,
+    path_batches,
+    threshold_masks,
+)
+from vectorvision.path_decomposition import Tracer, Turnpolicy
 from unittest.mock import mock_open, patch, MagicMock
 
 
@@ -22,3 +35,180 @@ def test_create_svg():
         handle.write.assert_any_call(expected_header)  # check header
         handle.write.assert_any_call("content")  # check content
         handle.write.assert_any_call(expected_footer)  # check footer
+
+
+def test_threshold_masks():
+    a = np.array([[0, 31, 32], [100, 200, 255]], dtype=np.uint8)
+    thresholds = range(0, 256, 32)
+    masks = list(threshold_masks(a, thresholds))
+    assert len(masks) == 8
+    for color, mask in zip(thresholds, masks):
+        assert mask.dtype == bool
+        assert np.array_equal(mask, np.where(np.isin(a, np.arange(0, color)), 0, 1))
+
+
+def test_histogram_layers_equal_bands():
+    a = np.arange(256, dtype=np.uint8).reshape(16, 16)
+    layers = histogram_layers(a, 4)
+    assert [color for color, _ in layers] == [52, 103, 154, 205]
+    assert layers[0][1] == layer_opacity(52, 64)
+
+
+def test_histogram_layers_merge_identical_masks():
+    a = np.array([[0, 0, 0, 255, 255]], dtype=np.uint8)
+    layers = histogram_layers(a, 8)
+    assert [color for color, _ in layers] == [1]
+    assert layers[0][1] > layer_opacity(1, 32)
+
+
+def test_histogram_layers_flat_image(tmp_path):
+    a = np.full((10, 20), 100, dtype=np.uint8)
+    layers = histogram_layers(a, 8)
+    assert [color for color, _ in layers] == [101]
+    assert not next(threshold_masks(a, [101])).any()
+    path = tmp_path / "flat.svg"
+    Converter(
+        Image.fromarray(a),
+        Turnpolicy.BLACK,
+        2,
+        1.0,
+        False,
+        0.2,
+        1,
+        adaptive_levels=True,
+    ).run(path)
+    assert path.read_text().count("<path") == 1
+
+
+def test_run_jobs_same_as_serial(tmp_path):
+    a = np.full((40, 60), 255, dtype=np.uint8)
+    a[5:20, 5:25] = 40
+    a[10:30, 30:50] = 120
+    a[25:35, 10:20] = 200
+    outputs = list()
+    for jobs in (1, 2):
+        path = tmp_path / f"jobs_{jobs}.svg"
+        Converter(
+            Image.fromarray(a), Turnpolicy.BLACK, 2, 1.0, False, 0.2, 1, jobs=jobs
+        ).run(path)
+        outputs.append(path.read_text())
+    assert outputs[0] == outputs[1]
+    assert outputs[0].count("<path") == 6
+
+
+def test_path_batches():
+    batches = path_batches([10, 500, 20, 300, 10, 40], 100)
+    assert batches == [[1], [3], [5, 2, 0, 4]]
+
+
+def test_run_binary_jobs_same_as_serial(tmp_path):
+    a = np.ones((40, 60), dtype=bool)
+    a[5:20, 5:25] = False
+    a[8:12, 8:12] = True
+    a[25:35, 30:50] = False
+    a[30, 10] = False
+    outputs = list()
+    for jobs in (1, 2):
+        path = tmp_path / f"jobs_{jobs}.svg"
+        Converter(
+            Image.fromarray(a), Turnpolicy.BLACK, 0, 1.0, False, 0.2, 1, jobs=jobs
+        ).run(path)
+        outputs.append(path.read_text())
+    assert outputs[0] == outputs[1]
+
+
+def test_is_bilevel():
+    a = np.full((50, 20, 3), 255, dtype=np.uint8)
+    assert not is_bilevel(Image.fromarray(a))
+    a[30:, 5:] = (10, 20, 30)
+    assert is_bilevel(Image.fromarray(a))
+    a[-1, -1] = (10, 20, 31)
+    assert not is_bilevel(Image.fromarray(a))
+    assert is_bilevel(Image.fromarray(a[:, :, 0] > 100))
+
+
+def test_run_shape_cache_same_curves(tmp_path):
+    glyph = np.ones((9, 7), dtype=bool)
+    glyph[1:8, 1:3] = glyph[1:3, 1:6] = glyph[4:6, 1:5] = False
+    a = np.ones((60, 500), dtype=bool)
+    for i, (row, column) in enumerate([(3, 5), (20, 131), (41, 250), (7, 487)]):
+        a[row : row + 9, column - i : column - i + 7] = glyph
+    outputs = list()
+    for cache_size in (0, 2**20):
+        path = tmp_path / f"cache_{cache_size}.svg"
+        converter = Converter(
+            Image.fromarray(a),
+            Turnpolicy.BLACK,
+            2,
+            1.0,
+            False,
+            0.2,
+            1,
+            shape_cache_size=cache_size,
+        )
+        converter.run(path)
+        outputs.append(path.read_text())
+    assert converter.shape_cache.hits == 3
+    # the cached curves are fitted at the origin, so they differ only by rounding
+    number = r"-?\d+(?:\.\d+)?(?:e-?\d+)?"
+    assert re.sub(number, "#", outputs[0]) == re.sub(number, "#", outputs[1])
+    uncached, cached = (
+        np.array(re.findall(number, output), dtype=float) for output in outputs
+    )
+    assert np.allclose(uncached, cached, rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize("mode", ["1", "L"])
+def test_image_mask(mode):
+    a = np.random.default_rng(0).random((13, 21)) < 0.5
+    mask = _ImageMask(Image.fromarray(a).convert(mode))
+    assert mask.shape == (13, 21)
+    assert np.array_equal(mask[2:9, 4:30], a[2:9, 4:])
+    assert np.array_equal(mask[5:20], a[5:])
+    assert np.array_equal(np.asarray(mask), a)
+    assert not mask.all()
+    assert _ImageMask(Image.fromarray(np.ones((3, 4), dtype=bool))).all()
+
+
+@pytest.mark.parametrize("packed", [False, True])
+def test_run_tiles_same_output(tmp_path, packed):
+    a = np.random.default_rng(1).random((40, 60)) < 0.7
+    outputs = list()
+    for tile_size in (None, 7):
+        path = tmp_path / f"tiles_{tile_size}.svg"
+        Converter(
+            Image.fromarray(a),
+            Turnpolicy.MAJORITY,
+            2,
+            1.0,
+            False,
+            0.2,
+            1,
+            Tracer.CRACK_EDGE,
+            packed=packed,
+            tile_size=tile_size,
+        ).run(path)
+        outputs.append(path.read_text())
+    assert outputs[0] == outputs[1]
+
+
+@pytest.mark.parametrize("turnpolicy", [Turnpolicy.MAJORITY, Turnpolicy.MINORITY])
+def test_tiles_need_crack_edge_tracer(turnpolicy):
+    image = Image.fromarray(np.ones((4, 4), dtype=bool))
+    with pytest.raises(ValueError):
+        Converter(image, turnpolicy, 2, 1.0, False, 0.2, 1, tile_size=8)
+
+
+@pytest.mark.parametrize("mode", ["RGB", "RGBA"])
+def test_run_multiband_bilevel_same_as_gray(tmp_path, mode):
+    a = np.full((30, 40), 255, dtype=np.uint8)
+    a[5:20, 5:25] = 0
+    a[25:28, 30:38] = 0
+    outputs = list()
+    for image_mode in ("L", mode):
+        path = tmp_path / f"bilevel_{image_mode}.svg"
+        image = Image.fromarray(a).convert(image_mode)
+        Converter(image, Turnpolicy.BLACK, 2, 1.0, False, 0.2, 1).run(path)
+        outputs.append(path.read_text())
+    assert outputs[0].count("<path") == 1
+    assert outputs[0] == outputs[1]
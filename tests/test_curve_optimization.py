@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 from vectorvision.curve_optimization import *
 from vectorvision.vertex_adjustment import _Curve
 
@@ -129,6 +130,20 @@ def test_tangent_degenerate_case():
     assert tangent(p0, p1, p2, p3, q0, q1) == -1
 
 
+def test_bezier_array():
+    x, y = bezier(np.array([0, 0.5, 1]), (0, 0), (1, 2), (3, 3), (4, 0))
+    assert x.tolist() == [0, 2.0, 4]
+    assert y.tolist() == [0, 1.875, 0]
+
+
+def test_tangents_matches_tangent():
+    p0, p1, p2, p3 = (0, 0), (2, 2), (3, 3), (3, 1.5)
+    q0 = np.array([(0, 1), (0, 1), (1, 1), (0, 0)], dtype=float)
+    q1 = np.array([(2, 2), (1, 2), (2, 2), (0, 0)], dtype=float)
+    expected = [tangent(p0, p1, p2, p3, a, b) for a, b in zip(q0, q1)]
+    assert tangents(p0, p1, p2, p3, q0, q1).tolist() == expected
+
+
 def test_calculate_alpha():
     assert calculate_alpha(10.813, 188.035) == pytest.approx(0.0485093)
 
@@ -301,3 +316,72 @@ def test_optimize_true_optimization(curve2):
     assert opti_curve[3].c[0][1] == pytest.approx(36.846204)
     assert opti_curve[3].c[1][1] == pytest.approx(29.526598)
     assert opti_curve[3].c[2][1] == pytest.approx(29.396734)
+
+
+def test_precalculate_context(curve1):
+    context = precalculate_context(curve1)
+    assert context.n == 3
+    assert context.convexity == precalculate_convexity(curve1)
+    assert context.areas == precalculate_areas(curve1)
+    assert context.vertices == [list(segment.vertex) for segment in curve1]
+    assert context.lengths[0] == calculate_distance(curve1[0].vertex, curve1[1].vertex)
+    assert context.end_lengths[2] == calculate_distance(curve1[2].c[2], curve1[0].c[2])
+
+
+def test_caluclate_penalty_context(curve2):
+    context = precalculate_context(curve2)
+    assert calculate_optimization_penalty(
+        curve2, 1, 3, 0.2, context
+    ) == calculate_optimization_penalty(curve2, 1, 3, 0.2)
+
+
+def test_precalculate_reach(curve2):
+    reach = precalculate_reach(curve2)
+    for j in range(1, curve2.n + 1):
+        i = j - 2
+        while i >= 0 and check_necessary_conditions(curve2, i, j % curve2.n):
+            i -= 1
+        assert reach[j] == i + 1
+
+
+def test_precalculate_reach_no_optimization(curve1):
+    assert precalculate_reach(curve1) == [0, 0, 1, 2]
+
+
+def test_calculate_penalty_edges_tangency_first_failure(curve2):
+    context = precalculate_context(curve2)
+    p0, p1, p2, p3 = (
+        context.ends[4],
+        context.vertices[5],
+        context.vertices[1],
+        context.ends[1],
+    )
+    assert (
+        calculate_penalty_edges_tangency(curve2, 4, 5, 0.5, p0, p1, p2, p3, context)
+        is None
+    )
+    assert (
+        calculate_penalty_edges_tangency(curve2, 5, 1, 0.5, p0, p1, p2, p3, context)
+        == 1
+    )
+    assert (
+        calculate_penalty_edges_tangency(curve2, 4, 1, 0.5, p0, p1, p2, p3, context)
+        is None
+    )
+
+
+def test_calculate_penalty_corners_span(curve2):
+    context = precalculate_context(curve2)
+    p0, p1, p2, p3 = (
+        context.ends[4],
+        context.vertices[5],
+        context.vertices[1],
+        context.ends[1],
+    )
+    penalty = calculate_penalty_corners(curve2, 4, 1, 0.5, p0, p1, p2, p3, context)
+    single = [
+        calculate_penalty_corners(curve2, i, (i + 1) % 6, 0.5, p0, p1, p2, p3, context)
+        for i in (4, 5, 0)
+    ]
+    assert penalty == pytest.approx(sum(single))
+    assert calculate_penalty_corners(curve2, 4, 1, 0.0, p0, p1, p2, p3, context) is None
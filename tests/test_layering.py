@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from vectorvision.layering import NestedLayerTracer, _top_level_regions
+from vectorvision.path_decomposition import Bitmap, Turnpolicy
+
+
+def trace(color_table):
+    return Bitmap(color_table).generate_paths_list(0, Turnpolicy.BLACK)
+
+
+def fit(paths):
+    return [len(path) for path in paths]
+
+
+@pytest.fixture
+def layers():
+    # a ring with a dot inside, and a square which grows in the second layer
+    first = np.ones((9, 12), dtype=int)
+    first[1:6, 1:6] = 0
+    first[2:5, 2:5] = 1
+    first[3, 3] = 0
+    first[2, 8] = 0
+    second = first.copy()
+    second[2:5, 8:11] = 0
+    return first, second
+
+
+def test_top_level_regions(layers):
+    first, _ = layers
+    labels = _top_level_regions(first == 0)
+    assert labels[0, 0] == 0
+    assert labels[1, 1] == labels[2, 2] == labels[3, 3]
+    assert labels[2, 8] not in (0, labels[1, 1])
+
+
+def test_trace_layer_same_as_full_trace(layers):
+    tracer = NestedLayerTracer(trace, fit)
+    for layer in layers:
+        paths, curves = tracer.trace_layer(layer)
+        assert paths == trace(layer)
+        assert curves == fit(paths)
+    assert (tracer.traced_regions, tracer.reused_regions) == (3, 1)
+
+
+def test_trace_layer_keeps_curves(layers):
+    first, second = layers
+    tracer = NestedLayerTracer(trace, lambda paths: [object() for _ in paths])
+    _, first_curves = tracer.trace_layer(first)
+    _, second_curves = tracer.trace_layer(second)
+    # the ring, its hole and the dot are kept, the square is fitted again
+    assert [second_curves[i] for i in (0, 1, 3)] == [first_curves[i] for i in (0, 1, 3)]
+    assert second_curves[2] is not first_curves[2]
+
+
+def test_trace_layer_not_nested(layers):
+    first, second = layers
+    tracer = NestedLayerTracer(trace, fit)
+    tracer.trace_layer(second)
+    with pytest.raises(ValueError):
+        tracer.trace_layer(first)
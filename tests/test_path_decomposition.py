@@ -1,7 +1,16 @@
 import pytest
 import numpy as np
 from PIL import Image
-from vectorvision.path_decomposition import Bitmap
+from vectorvision.path_decomposition import (
+    Bitmap,
+    PackedBitmap,
+    Path,
+    TiledBitmap,
+    Tracer,
+    Turnpolicy,
+    build_path_tree,
+    get_subtrees,
+)
 
 # ============= Bitmap constructor ===============
 
@@ -83,6 +92,20 @@ def test_find_next_path_start_standard(bm_standard):
         bm_standard.bitmap[ex[0], ex[1]] = 0
 
 
+def test_find_next_path_start_resumes_across_rows():
+    array = np.ones((5, 300), dtype=int)
+    array[1, 250] = 0
+    array[4, 3] = 0
+    bm = Bitmap(array)
+    starts = bm._find_next_path_start()
+    for ex in [np.array([1, 250]), np.array([4, 3])]:
+        start = next(starts)
+        assert np.array_equal(start, ex)
+        bm.bitmap[ex[0], ex[1]] = 0
+    with pytest.raises(StopIteration):
+        next(starts)
+
+
 # ======== _get_majority_value ========
 
 
@@ -150,6 +173,65 @@ def test_majority_value_all_zeros():
     assert test_class._get_majority_value(2, 2) == 0
 
 
+@pytest.mark.parametrize("bitmap_class", [Bitmap, PackedBitmap])
+@pytest.mark.parametrize("shape", [(1, 1), (3, 5), (9, 2), (40, 27)])
+def test_majority_map_matches_majority_value(bitmap_class, shape):
+    array = np.random.default_rng(sum(shape)).random(shape) < 0.6
+    test_class = bitmap_class(array)
+    height, width = shape
+    expected = [
+        [test_class._get_majority_value(x, y) for x in range(width + 1)]
+        for y in range(height + 1)
+    ]
+    ys, xs = np.mgrid[: height + 1, : width + 1]
+    values = test_class._majority_lookup(xs.ravel(), ys.ravel())
+    assert values.reshape(height + 1, width + 1).tolist() == expected
+
+
+@pytest.mark.parametrize("bitmap_class", [Bitmap, PackedBitmap])
+def test_majority_at_after_invert_color(bitmap_class):
+    array = np.random.default_rng(7).random((150, 37)) < 0.6
+    test_class = bitmap_class(array)
+    test_class._majority_at(0, 0)
+    test_class._majority_at(0, 100)
+    test_class._invert_color_inside_path([(3, 4), (3, 3), (12, 3), (12, 4)])
+    test_class._invert_color_inside_path([(20, 120), (20, 117), (30, 117), (30, 120)])
+    # far from the first window, which is moved to the stale cells
+    assert test_class._majority_stale == (114, 124, 17, 34)
+    assert test_class._majority_stale_cells[:2, 0].tolist() == [8, 0]
+    test_class._invert_color_inside_path([(25, 130), (25, 123), (27, 123), (27, 130)])
+    # close to the second window, which is merged with it
+    assert test_class._majority_stale == (114, 134, 17, 34)
+    # the first lookups of stale values compute them one by one
+    expected = test_class._get_majority_value(26, 120)
+    assert test_class._majority_at(26, 120) == expected
+    assert test_class._majority_stale_lookups == 7
+    for y in range(151):
+        for x in range(38):
+            expected = test_class._get_majority_value(x, y)
+            assert test_class._majority_at(x, y) == expected
+    assert test_class._majority_stale is None
+    assert not test_class._majority_stale_cells.any()
+    # the bands are kept packed, 8 values per byte
+    shapes = [band.shape for band in test_class._majority.values()]
+    assert shapes == [(64, 5), (64, 5), (23, 5)]
+
+
+@pytest.mark.parametrize("bitmap_class", [Bitmap, PackedBitmap])
+@pytest.mark.parametrize("turnpolicy", [Turnpolicy.MAJORITY, Turnpolicy.MINORITY])
+@pytest.mark.parametrize("density", [0.03, 0.5])
+def test_majority_paths_same_as_majority_value(bitmap_class, turnpolicy, density):
+    class ScalarMajority(bitmap_class):
+        def _majority_at(self, x, y):
+            return self._get_majority_value(x, y)
+
+    array = np.random.default_rng(11).random((150, 90)) > density
+    for tracer in (Tracer.LOOKUP_TABLE, Tracer.REFERENCE):
+        expected = ScalarMajority(array).generate_paths_list(0, turnpolicy, tracer)
+        result = bitmap_class(array).generate_paths_list(0, turnpolicy, tracer)
+        assert result == expected
+
+
 # ============= find_path =============
 
 
@@ -232,3 +314,255 @@ def test_generate_paths_list_one_path(bm_one_path):
     expected = [[(1, 2), (1, 1), (2, 1), (3, 1), (3, 2), (3, 3), (2, 3), (1, 3)]]
     result = bm_one_path.generate_paths_list()
     assert result == expected
+
+
+@pytest.mark.parametrize("turnpolicy", list(Turnpolicy))
+def test_generate_paths_list_lookup_table_matches_reference(turnpolicy):
+    array = np.random.default_rng(7).random((24, 31)) < 0.5
+    expected = Bitmap(array).generate_paths_list(0, turnpolicy, Tracer.REFERENCE)
+    result = Bitmap(array).generate_paths_list(0, turnpolicy, Tracer.LOOKUP_TABLE)
+    assert result == expected
+
+
+@pytest.mark.parametrize(
+    "turnpolicy",
+    [Turnpolicy.BLACK, Turnpolicy.WHITE, Turnpolicy.LEFT, Turnpolicy.RIGHT],
+)
+@pytest.mark.parametrize("seed", range(5))
+def test_generate_paths_list_crack_edge_matches_reference(turnpolicy, seed):
+    array = np.random.default_rng(seed).random((19, 23)) < 0.5
+    expected = Bitmap(array).generate_paths_list(2, turnpolicy, Tracer.REFERENCE)
+    result = Bitmap(array).generate_paths_list(2, turnpolicy, Tracer.CRACK_EDGE)
+    assert result == expected
+
+
+def test_generate_paths_list_crack_edge_start_at_junction():
+    array = np.array([[1, 0, 0, 0], [0, 1, 0, 1], [0, 0, 0, 0]])
+    expected = Bitmap(array).generate_paths_list(0, Turnpolicy.BLACK)
+    result = Bitmap(array).generate_paths_list(0, Turnpolicy.BLACK, Tracer.CRACK_EDGE)
+    assert result == expected
+    assert len(result) == 2
+
+
+# ============= PackedBitmap ===============
+
+
+def test_packed_bitmap_non_binary():
+    with pytest.raises(ValueError):
+        PackedBitmap(np.array([[1, 2], [2, 1]]))
+
+
+def test_packed_bitmap_valid():
+    bm = PackedBitmap(np.array([[1, 0], [0, 1]]))
+    assert np.array_equal(bm.bitmap, np.array([[0, 1], [1, 0]]))
+    assert bm.packed.shape == (4, 1)
+
+
+@pytest.mark.parametrize("width", [1, 6, 7, 8, 9, 17])
+def test_packed_bitmap_from_pil_image(width):
+    array = np.random.default_rng(width).random((5, width)) < 0.5
+    image = Image.fromarray(array)
+    bm = PackedBitmap.from_pil_image(image)
+    assert np.array_equal(bm.packed, PackedBitmap(array).packed)
+    assert np.array_equal(bm.bitmap, Bitmap.from_pil_image(image).bitmap)
+
+
+def test_packed_bitmap_xor_to_ref():
+    bm = PackedBitmap(np.ones((2, 20)))
+    bm._xor_to_ref(14, 1, 3)
+    expected = np.zeros((2, 20), dtype=bool)
+    expected[1, 3:14] = True
+    assert np.array_equal(bm.bitmap, expected)
+
+
+@pytest.mark.parametrize("tracer", list(Tracer))
+@pytest.mark.parametrize("turnpolicy", list(Turnpolicy))
+def test_packed_bitmap_generate_paths_list(tracer, turnpolicy):
+    array = np.random.default_rng(11).random((13, 21)) < 0.5
+    expected = Bitmap(array).generate_paths_list(0, turnpolicy, tracer)
+    result = PackedBitmap(array).generate_paths_list(0, turnpolicy, tracer)
+    assert result == expected
+
+
+# ============= remove_specks =============
+
+
+def test_remove_specks_black_and_white():
+    bitmap = np.ones((12, 12))
+    bitmap[1, 1] = 0  # lone black pixel
+    bitmap[4:10, 4:10] = 0  # black square with a one pixel hole
+    bitmap[6, 6] = 1
+    bm = Bitmap(bitmap)
+    assert bm.remove_specks(2) == 2
+    expected = np.zeros((12, 12), dtype=bool)
+    expected[4:10, 4:10] = True
+    assert np.array_equal(bm.bitmap, expected)
+
+
+def test_remove_specks_keeps_diagonal_holes():
+    # the hole touches the background diagonally, so it is not removed
+    bitmap = np.ones((5, 5))
+    bitmap[1, 2] = bitmap[2, 1] = bitmap[2, 3] = bitmap[3, 2] = 0
+    bm = Bitmap(bitmap)
+    assert bm.remove_specks(1) == 0
+    assert np.array_equal(bm.bitmap, Bitmap(bitmap).bitmap)
+
+
+def test_remove_specks_nested():
+    bitmap = np.ones((7, 7))
+    bitmap[1:6, 1:6] = 0
+    bitmap[2:5, 2:5] = 1
+    bitmap[3, 3] = 0
+    bm = Bitmap(bitmap)
+    assert bm.remove_specks(25) == 1
+    assert not bm.bitmap.any()
+
+
+@pytest.mark.parametrize("bitmap_class", [Bitmap, PackedBitmap])
+@pytest.mark.parametrize("shape", [(5, 7), (1, 1)])
+def test_remove_specks_all_white(bitmap_class, shape):
+    bm = bitmap_class(np.ones(shape))
+    assert bm.remove_specks(2) == 0
+    assert not bm.bitmap.any()
+    assert bm.generate_paths_list(2) == []
+
+
+@pytest.mark.parametrize("bitmap_class", [Bitmap, PackedBitmap])
+@pytest.mark.parametrize(
+    "turnpolicy",
+    [Turnpolicy.BLACK, Turnpolicy.WHITE, Turnpolicy.LEFT, Turnpolicy.RIGHT],
+)
+@pytest.mark.parametrize("turdsize", [0, 2, 5, 20])
+def test_remove_specks_keeps_paths(bitmap_class, turnpolicy, turdsize):
+    array = np.random.default_rng(turdsize).random((30, 25)) < 0.4
+    expected = Bitmap(array).generate_paths_list(turdsize, turnpolicy)
+    bm = bitmap_class(array)
+    bm.remove_specks(turdsize)
+    assert bm.generate_paths_list(turdsize, turnpolicy) == expected
+
+
+# ============= TiledBitmap =============
+
+
+def test_tiled_bitmap_invalid_tile_size():
+    with pytest.raises(ValueError):
+        TiledBitmap(np.ones((2, 2)), 0)
+
+
+def test_tiled_bitmap_non_binary():
+    with pytest.raises(ValueError):
+        TiledBitmap(np.array([[1, 2], [2, 1]])).generate_paths_list()
+
+
+@pytest.mark.parametrize("tile_size", [1, 2, 5, 64])
+@pytest.mark.parametrize("turnpolicy", list(Turnpolicy))
+def test_tiled_bitmap_generate_paths_list(tile_size, turnpolicy):
+    array = np.random.default_rng(tile_size).random((17, 23)) < 0.5
+    expected = Bitmap(array).generate_paths_list(0, turnpolicy, Tracer.CRACK_EDGE)
+    result = TiledBitmap(array, tile_size).generate_paths_list(0, turnpolicy)
+    assert result == expected
+
+
+def test_tiled_bitmap_path_across_tiles():
+    array = np.ones((10, 10))
+    array[2:8, 1:9] = 0
+    array[4:6, 3:7] = 1
+    result = TiledBitmap(array, 3).generate_paths_list(2, Turnpolicy.BLACK)
+    assert result == Bitmap(array).generate_paths_list(2, Turnpolicy.BLACK)
+    assert len(result) == 2
+
+
+# ============= Path =============
+
+
+def test_path_area_and_sign():
+    points = [(1, 2), (1, 1), (2, 1), (3, 1), (3, 2), (3, 3), (2, 3), (1, 3)]
+    path = Path(points)
+    assert path.points.dtype == np.int32
+    assert path.area == 4
+    assert path.sign == 1
+    assert Path(points[::-1]).sign == -1
+    assert path == points
+    assert len(path) == 8
+    assert tuple(path[2]) == (2, 1)
+
+
+def test_path_asarray_does_not_copy():
+    path = Path([(1, 2), (1, 1), (2, 1), (2, 2)])
+    assert np.asarray(path) is path.points
+
+
+def test_path_array_copies():
+    path = Path([(1, 2), (1, 1), (2, 1), (2, 2)])
+    array = np.array(path)
+    array[0] = (7, 7)
+    assert tuple(path[0]) == (1, 2)
+    assert np.array(path, dtype=float)[1].tolist() == [1.0, 1.0]
+    with pytest.raises(ValueError):
+        np.asarray(path, dtype=float, copy=False)
+
+
+@pytest.mark.parametrize("tracer", list(Tracer))
+def test_generate_paths_list_returns_paths(tracer):
+    array = np.random.default_rng(3).random((15, 15)) < 0.5
+    paths = Bitmap(array).generate_paths_list(2, Turnpolicy.BLACK, tracer)
+    for path in paths:
+        assert isinstance(path, Path)
+        assert path.area == Path(path.points).area
+        assert path.area > 2
+
+
+@pytest.mark.parametrize("length", [4, 5, 6, 7, 8])
+def test_path_chain_code(length):
+    array = np.ones((3, 6))
+    array[1, 1 : length - 2] = 0
+    path = Bitmap(array).generate_paths_list(0)[0]
+    code = path.to_chain_code()
+    assert len(code.steps) == (len(path) + 3) // 4
+    assert Path.from_chain_code(code) == path
+
+
+def test_path_chain_code_non_unit_step():
+    with pytest.raises(ValueError):
+        Path([(0, 0), (2, 0), (2, 1)]).to_chain_code()
+
+
+# ============= build_path_tree =============
+
+
+@pytest.fixture
+def nested_paths():
+    # outline with a hole holding an island, next to a second outline
+    array = np.ones((9, 12))
+    array[1:8, 1:8] = 0
+    array[2:7, 2:7] = 1
+    array[3:6, 3:6] = 0
+    array[2:5, 9:11] = 0
+    return Bitmap(array).generate_paths_list(0, Turnpolicy.BLACK)
+
+
+def test_build_path_tree(nested_paths):
+    tree = build_path_tree(nested_paths)
+    assert tree.parents == [-1, 0, -1, 1]
+    assert tree.depths == [0, 1, 0, 2]
+
+
+def test_build_path_tree_empty():
+    assert build_path_tree([]) == ([], [])
+
+
+def test_get_subtrees(nested_paths):
+    assert get_subtrees(build_path_tree(nested_paths)) == [[0, 1, 3], [2]]
+
+
+@pytest.mark.parametrize("tracer", list(Tracer))
+def test_build_path_tree_siblings(tracer):
+    array = np.ones((8, 17))
+    array[1:7, 1:16] = 0
+    for column in (2, 6, 10):
+        array[2:6, column : column + 3] = 1
+    array[3:5, 11] = 0
+    paths = Bitmap(array).generate_paths_list(0, Turnpolicy.BLACK, tracer)
+    tree = build_path_tree(paths)
+    assert tree.parents == [-1, 0, 0, 0, 3]
+    assert get_subtrees(tree) == [[0, 1, 2, 3, 4]]
@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 from vectorvision.polygons import (
     Sums,
@@ -10,12 +11,14 @@ from vectorvision.polygons import (
     get_pivot_points,
     get_longest_straight_subpaths,
     penalty3,
+    penalty3_batch,
     clip_path_backward,
     clip_path_forward,
     get_segment_bounds_backward,
     get_segment_bounds_forward,
     get_best_polygon
 )
+from vectorvision.path_decomposition import Path
 
 @pytest.fixture
 def sample_path():
@@ -23,15 +26,15 @@ def sample_path():
 
 @pytest.fixture
 def sample_sums():
-    return [
+    return np.array([
         Sums(x=0, y=0, xy=0, x2=0, y2=0),
         Sums(x=0, y=0, xy=0, x2=0, y2=0),
         Sums(x=1, y=1, xy=1, x2=1, y2=1),
         Sums(x=3, y=3, xy=5, x2=5, y2=5),
         Sums(x=6, y=6, xy=14, x2=14, y2=14),
-    ]
+    ])
 def test_simple_calc_sums(sample_path, sample_sums):
-    assert calc_sums(sample_path) == sample_sums
+    assert np.array_equal(calc_sums(sample_path), sample_sums)
     
 @pytest.fixture
 def sample_cyclic_path():
@@ -39,7 +42,7 @@ def sample_cyclic_path():
 
 @pytest.fixture
 def sample_cyclic_sums():
-    return [Sums(x=0, y=0, xy=0, x2=0, y2=0), 
+    return np.array([Sums(x=0, y=0, xy=0, x2=0, y2=0), 
             Sums(x=0, y=0, xy=0, x2=0, y2=0), 
             Sums(x=0, y=-1, xy=0, x2=0, y2=1), 
             Sums(x=1, y=-2, xy=-1, x2=1, y2=2), 
@@ -51,9 +54,9 @@ def sample_cyclic_sums():
             Sums(x=17, y=1, xy=7, x2=45, y2=13), 
             Sums(x=18, y=3, xy=9, x2=46, y2=17), 
             Sums(x=18, y=5, xy=9, x2=46, y2=21), 
-            Sums(x=18, y=6, xy=9, x2=46, y2=22)]
+            Sums(x=18, y=6, xy=9, x2=46, y2=22)])
 def test_cylic_calc_sums(sample_cyclic_path, sample_cyclic_sums):
-    assert calc_sums(sample_cyclic_path) == sample_cyclic_sums
+    assert np.array_equal(calc_sums(sample_cyclic_path), sample_cyclic_sums)
 
     
 @pytest.mark.parametrize("a, b, c,  expected", [
@@ -164,6 +167,14 @@ def test_get_longest_straight_subpaths(path, expected_longest_straight_subpaths)
 def test_penalty3(sample_cyclic_path, sample_cyclic_sums, i, j, expected_penalty):
     result = penalty3(sample_cyclic_path, sample_cyclic_sums, i, j)
     assert result == pytest.approx(expected_penalty, 1e-4)
+
+
+@pytest.mark.parametrize("j", [1, 4, 8, 11, 12, 15])
+def test_penalty3_batch(sample_cyclic_path, sample_cyclic_sums, j):
+    starts = np.arange(min(j, 11), -1, -1)
+    result = penalty3_batch(sample_cyclic_path, sample_cyclic_sums, starts, j)
+    expected = [penalty3(sample_cyclic_path, sample_cyclic_sums, i, j) for i in starts]
+    assert result.tolist() == expected
     
 
 @pytest.mark.parametrize("longest_straight_subpaths, path_len, expected_forward_clips", [
@@ -237,4 +248,10 @@ def test_segment_bounds_backward(clips, path_len, segment_num, expected_segment_
 ])
 def test_get_best_polygon(path, expected_polygon):
     polygon = get_best_polygon(path)
-    assert polygon == expected_polygon
\ No newline at end of file
+    assert polygon == expected_polygon
+
+def test_get_best_polygon_path():
+    points = [(123, 37), (123, 36), (124, 36), (125, 36), (126, 36), (126, 37), (126, 38), (126, 39), (125, 39), (124, 39), (123, 39), (123, 38)]
+    assert get_best_polygon(Path(points)) == get_best_polygon(points)
+    assert np.array_equal(calc_sums(Path(points)), calc_sums(points))
+    assert get_longest_straight_subpaths(Path(points)) == get_longest_straight_subpaths(points)
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+from vectorvision.path_decomposition import Path
+from vectorvision.polygons import get_best_polygon
+from vectorvision.shape_cache import ShapeCache, _shape_key, _shift_curve, fit_at_origin
+from vectorvision.vertex_adjustment import adjust_vertices
+
+
+@pytest.fixture
+def sample_path():
+    return [(1, 2), (1, 1), (2, 1), (3, 1), (3, 2), (3, 3), (2, 3), (1, 3)]
+
+
+def fit(path):
+    return adjust_vertices(path, get_best_polygon(path))
+
+
+def vertices(curve):
+    return [tuple(segment.vertex) for segment in curve.segments]
+
+
+def test_shape_key_translation(sample_path):
+    shape, origin = _shape_key(sample_path)
+    moved_shape, moved_origin = _shape_key([(x + 5, y + 7) for x, y in sample_path])
+    assert shape == moved_shape
+    assert origin == (1, 2)
+    assert moved_origin == (6, 9)
+
+
+def test_shape_key_not_unit_steps():
+    shape, origin = _shape_key([(3, 4), (3, 1), (5, 1)])
+    assert _shape_key([(0, 4), (0, 1), (2, 1)])[0] == shape
+    assert origin == (3, 4)
+
+
+def test_shift_curve(sample_path):
+    curve = fit(sample_path)
+    shifted = _shift_curve(curve, 2.0, -1.0)
+    assert vertices(shifted) == [(x + 2.0, y - 1.0) for x, y in vertices(curve)]
+    assert vertices(curve) == vertices(fit(sample_path))
+
+
+def test_get_curve_hit(sample_path):
+    cache = ShapeCache(2**20)
+    curve = cache.get_curve(Path(sample_path), fit)
+    moved = cache.get_curve(Path(np.asarray(sample_path) + (10, 20)), fit)
+    assert (cache.hits, cache.misses, len(cache)) == (1, 1, 1)
+    assert vertices(moved) == [(x + 10, y + 20) for x, y in vertices(curve)]
+
+
+def test_get_curve_params(sample_path):
+    cache = ShapeCache(2**20)
+    cache.get_curve(sample_path, fit, params=1.0)
+    cache.get_curve(sample_path, fit, params=0.5)
+    assert (cache.hits, cache.misses, len(cache)) == (0, 2, 2)
+
+
+def test_get_curve_eviction(sample_path):
+    cache = ShapeCache(2**20)
+    cache.get_curve(sample_path, fit)
+    cache.max_bytes = cache.nbytes
+    cache.get_curve([(1, 2), (1, 1), (2, 1), (2, 2)], fit)
+    assert len(cache) == 1
+    assert cache.nbytes <= cache.max_bytes
+    cache.get_curve(sample_path, fit)
+    assert (cache.hits, cache.misses) == (0, 3)
+
+
+def test_get_curve_too_large(sample_path):
+    cache = ShapeCache(1)
+    cache.get_curve(sample_path, fit)
+    assert len(cache) == 0
+    assert cache.nbytes == 0
+
+
+def test_fit_at_origin_translation(sample_path):
+    at_origin = fit(Path(np.asarray(sample_path) - (1, 2)))
+    curve = fit_at_origin(sample_path, fit)
+    moved = fit_at_origin([(x + 1000, y + 3) for x, y in sample_path], fit)
+    assert np.array_equal(curve.c, _shift_curve(at_origin, 1, 2).c)
+    assert np.array_equal(moved.c, _shift_curve(at_origin, 1001, 5).c)
+
+
+def test_get_curve_same_as_fit_at_origin(sample_path):
+    moved_path = [(x + 3, y + 1) for x, y in sample_path]
+    cache = ShapeCache(2**20)
+    cache.get_curve(sample_path, fit)
+    cached = cache.get_curve(moved_path, fit)
+    fitted = fit_at_origin(moved_path, fit)
+    assert cache.hits == 1
+    assert np.array_equal(cached.c, fitted.c)
+    assert np.array_equal(cached.vertex, fitted.vertex)
@@ -1,5 +1,6 @@
-from vectorvision.smoothing import interval, calculate_alpha, smooth
+from vectorvision.smoothing import interval, calculate_alpha, calculate_alphas, smooth
 from vectorvision.vertex_adjustment import _Curve
+import numpy as np
 import pytest
 
 
@@ -97,3 +98,15 @@ def test_smooth2():
     assert curve[2].c[2] == (21, 3)
     assert curve[3].c[2] == (9.5, -0.25)
     assert curve[4].c[2] == (-6.5, -3.25)
+
+
+def test_calculate_alphas():
+    triples = [
+        ((-9.5, 2), (-6, 3), (-3.5, 0.5)),
+        ((-7.94, -5.71), (-9, 4), (3.14, -3.35)),
+        ((-6, 1), (-6, 5), (-6, 1)),
+        ((-8.4, 6.4), (-8.6, 7.2), (-7.8, 6.8)),
+    ]
+    points0, points1, points2 = np.array(triples).transpose(1, 0, 2)
+    alphas = calculate_alphas(points0, points1, points2)
+    assert alphas.tolist() == [calculate_alpha(*triple) for triple in triples]
@@ -2,7 +2,15 @@ from vectorvision.vertex_adjustment import (
     calculate_intersection_point,
     find_closest_point_in_boundary,
 )
-from vectorvision.vertex_adjustment import fit_least_squares, adjust_vertices
+from vectorvision.vertex_adjustment import (
+    _Curve,
+    fit_least_squares,
+    fit_edge_lines,
+    adjust_vertices,
+)
+from vectorvision.path_decomposition import Path
+from vectorvision.polygons import calc_sums
+import numpy as np
 import pytest
 
 
@@ -78,3 +86,128 @@ def test_adjust_vertices():
     assert curves[1].vertex[1] == pytest.approx(15.5, abs=1e-6)
     assert curves[2].vertex[0] == pytest.approx(8.259366, abs=1e-6)
     assert curves[2].vertex[1] == pytest.approx(-6.604776, abs=1e-6)
+
+
+def test_adjust_vertices_path():
+    points = [(0, 0), (5, 6), (8, 13), (10, 15), (10, 8), (9, 0), (9, -3), (8, -7)]
+    curves = adjust_vertices(Path(points), [0, 3, 5])
+    expected = adjust_vertices(points, [0, 3, 5])
+    for segment, expected_segment in zip(curves.segments, expected.segments):
+        assert segment.vertex == expected_segment.vertex
+
+
+def test_fit_edge_lines():
+    path = np.array([(0, 0), (5, 6), (8, 13), (10, 15), (10, 8), (9, 0), (9, -3)])
+    starts = np.array([0, 3, 5])
+    ends = np.array([3, 5, 0])
+    a, b, vertical = fit_edge_lines(path, calc_sums(path), starts, ends, path[starts])
+    for i, (start, end) in enumerate(zip(starts, ends)):
+        points = (
+            np.concatenate((path[start:], path[: end + 1]))
+            if end < start
+            else path[start : end + 1]
+        )
+        expected_a, expected_b = fit_least_squares(points - path[start])
+        assert a[i] == pytest.approx(expected_a, abs=1e-9)
+        assert b[i] == pytest.approx(expected_b, abs=1e-9)
+    assert not vertical.any()
+
+
+def test_fit_edge_lines_vertical():
+    path = np.array([(2, 0), (2, 1), (2, 2), (3, 2), (3, 1), (3, 0)])
+    starts = np.array([0, 2, 3, 5])
+    ends = np.array([2, 3, 5, 0])
+    a, b, vertical = fit_edge_lines(path, calc_sums(path), starts, ends, path[ends])
+    assert vertical.tolist() == [True, False, True, False]
+    assert b.tolist() == [0.0, 0.0, 0.0, 0.0]
+
+
+def test_adjust_vertices_square():
+    points = [
+        (0, 0),
+        (0, 1),
+        (0, 2),
+        (0, 3),
+        (1, 3),
+        (2, 3),
+        (3, 3),
+        (3, 2),
+        (3, 1),
+        (3, 0),
+        (2, 0),
+        (1, 0),
+    ]
+    curves = adjust_vertices(points, [0, 3, 6, 9])
+    assert [tuple(segment.vertex) for segment in curves.segments] == [
+        (0, 0),
+        (0, 3),
+        (3, 3),
+        (3, 0),
+    ]
+
+
+def test_adjust_vertices_parallel():
+    points = [(4, 4), (5, 4), (6, 4), (7, 4), (7, 5), (6, 5), (5, 5), (4, 5)]
+    curves = adjust_vertices(points, [0, 1, 3, 4, 5, 7])
+    assert curves[1].vertex == [5, 4]
+    moved = adjust_vertices([(x + 100, y + 30) for x, y in points], [0, 1, 3, 4, 5, 7])
+    assert moved[1].vertex == [105, 34]
+
+
+@pytest.mark.parametrize("offset", [(0, 0), (100, 30)])
+def test_adjust_vertices_vertical_and_wrapping_edges(offset):
+    # edge 0 is vertical, edge 2 wraps past index 0 of the path
+    points = [(0, 0), (0, 1), (0, 2), (0, 3), (1, 3), (2, 2), (3, 1), (3, 0)]
+    points += [(2, 0), (1, 0)]
+    dx, dy = offset
+    curves = adjust_vertices([(x + dx, y + dy) for x, y in points], [0, 3, 6])
+    expected = [(0, -2 / 17), (0, 3.3), (3.5, 1 - 64 / 149)]
+    for segment, (x, y) in zip(curves.segments, expected):
+        assert segment.vertex[0] == pytest.approx(x + dx, abs=1e-9)
+        assert segment.vertex[1] == pytest.approx(y + dy, abs=1e-9)
+
+
+def test_adjust_vertices_parallel_vertical():
+    points = [
+        (0, 0),
+        (0, 1),
+        (0, 2),
+        (0, 3),
+        (1, 3),
+        (2, 3),
+        (3, 3),
+        (3, 2),
+        (3, 1),
+        (3, 0),
+        (2, 0),
+        (1, 0),
+    ]
+    curves = adjust_vertices(points, [0, 2, 3, 6, 9])
+    assert curves[1].vertex == [0, 2]
+    assert curves[2].vertex == [0, 3]
+
+
+def test_curve_segments_write_arrays():
+    curve = _Curve(3)
+    curve[0].vertex = (1.5, 2.5)
+    curve[1].vertex[1] = 4.0
+    curve[2].c[1] = curve[2].vertex
+    curve[-1].c[2] = (7, 8)
+    curve[2].tag = 2
+    curve[1].alpha = 0.75
+    assert curve.vertex.tolist() == [[1.5, 2.5], [0.0, 4.0], [0.0, 0.0]]
+    assert curve.c[2].tolist() == [[0.0, 0.0], [0.0, 0.0], [7.0, 8.0]]
+    assert curve.tag.tolist() == [0, 0, 2]
+    assert curve.alpha.tolist() == [0.0, 0.75, 0.0]
+
+
+def test_curve_segments_read_arrays():
+    curve = _Curve(2)
+    curve.vertex[:] = [(1.0, 2.0), (3.0, 4.0)]
+    curve.c[1] = [(0.5, 0.5), (1.5, 1.5), (2.5, 2.5)]
+    assert curve[1].vertex == [3.0, 4.0]
+    assert curve[1].c == [(0.5, 0.5), (1.5, 1.5), (2.5, 2.5)]
+    assert curve[-2].vertex[0] == 1.0
+    assert [tuple(segment.vertex) for segment in curve] == [(1.0, 2.0), (3.0, 4.0)]
+    with pytest.raises(IndexError):
+        curve[2]
@@ -1,13 +1,27 @@
 from PIL import ImageOps, Image
 import time
 import numpy as np
-from vectorvision.path_decomposition import Bitmap
+from vectorvision.path_decomposition import (
+    Bitmap,
+    PackedBitmap,
+    Path,
+    TiledBitmap,
+    Tracer,
+    Turnpolicy,
+    build_path_tree,
+    get_subtrees,
+)
+from vectorvision.layering import NestedLayerTracer
 from vectorvision.smoothing import smooth, POTRACE_CURVETO
 from vectorvision.polygons import get_best_polygon
 from vectorvision.vertex_adjustment import adjust_vertices, _Curve
 from vectorvision.curve_optimization import optimize_curve
+from vectorvision.shape_cache import ShapeCache
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import contextmanager
+from multiprocessing import shared_memory
 from typing import TextIO
+import copy
 
 
 @contextmanager
@@ -37,19 +51,279 @@ def create_svg(name: str, width: int, height: int):
         file.close()
 
 
+# bounds of the number of image rows checked at once by is_bilevel
+_BILEVEL_ROWS_MIN = 8
+_BILEVEL_ROWS_MAX = 1024
+
+# number of points up to which small paths are fitted together in one task
+_PATH_BATCH_POINTS = 8192
+
+
+def is_bilevel(image: Image) -> bool:
+    """
+    Checks whether the image has exactly two distinct colors.
+
+    The image is read in growing bands of rows, and the check stops at the
+    first pixel with a third color, so photos are usually rejected after their
+    first rows, without counting all of their colors.
+
+    Args:
+        image (PIL.Image): The image to check.
+
+    Returns:
+        bool: True if the image has exactly two colors, in any mode.
+    """
+    colors = list()
+    top, rows = 0, _BILEVEL_ROWS_MIN
+    while top < image.height:
+        bottom = min(top + rows, image.height)
+        block = np.asarray(image.crop((0, top, image.width, bottom)))
+        pixels = block.reshape(block.shape[0] * block.shape[1], -1)
+        while True:
+            new = np.ones(len(pixels), dtype=bool)
+            for color in colors:
+                new &= (pixels != color).any(axis=1)
+            if not new.any():
+                break
+            if len(colors) == 2:
+                return False
+            colors.append(pixels[new.argmax()])
+        top, rows = bottom, min(2 * rows, _BILEVEL_ROWS_MAX)
+    return len(colors) == 2
+
+
+class _ImageMask:
+    """
+    Bool mask of the nonzero pixels of an image, read from it block by block.
+
+    Bitmaps slice the mask in bands of rows or in tiles, so it never has to be
+    held whole unless the bitmap keeps a full copy of it anyway.
+
+    Attributes:
+        image (PIL.Image): The single band image.
+        shape (tuple[int, int]): The height and width of the mask.
+        dtype (np.dtype): The dtype of the blocks, bool.
+    """
+
+    dtype = np.dtype(bool)
+
+    def __init__(self, image: Image):
+        self.image = image
+        self.shape = (image.height, image.width)
+
+    def __getitem__(self, key) -> np.ndarray:
+        rows, columns = key if isinstance(key, tuple) else (key, slice(None))
+        top, bottom, _ = rows.indices(self.shape[0])
+        left, right, _ = columns.indices(self.shape[1])
+        box = (left, top, max(left, right), max(top, bottom))
+        block = np.asarray(self.image.crop(box))
+        return block if block.dtype == bool else block != 0
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        mask = self[:, :]
+        return mask if dtype is None else mask.astype(dtype)
+
+    def all(self) -> bool:
+        """
+        Checks whether every pixel of the image is nonzero.
+        """
+        return self.image.getextrema()[0] != 0
+
+
+def threshold_masks(a: np.ndarray, thresholds):
+    """
+    Yields the bitmaps of the pixels darker than each of the thresholds.
+
+    Every pixel is mapped once, through a lookup table of the gray levels, to the
+    number of thresholds it reaches, so the masks are built in one pass over the
+    image instead of a membership test per threshold.
+
+    Args:
+        a (np.ndarray): The grayscale image with values in 0..255.
+        thresholds (Sequence[int]): The thresholds in increasing order.
+
+    Yields:
+        np.ndarray: Bool bitmap with False for the pixels darker than the threshold
+            and True for the others, for every threshold in order.
+    """
+    lut = np.searchsorted(thresholds, np.arange(256), side="right").astype(np.uint16)
+    reached = lut[a]
+    for i in range(len(thresholds)):
+        yield reached > i
+
+
+def layer_opacity(color: int, step: float) -> float:
+    """
+    Calculates the opacity of the layer of the pixels darker than a threshold.
+
+    Args:
+        color (int): The threshold of the layer.
+        step (float): The distance between the thresholds of consecutive layers.
+
+    Returns:
+        float: The opacity of the layer.
+    """
+    return (1 - color / 255) * min(1, step / 60)
+
+
+def histogram_layers(a: np.ndarray, levels: int) -> list[tuple[int, float]]:
+    """
+    Picks the thresholds and opacities of the layers from the image histogram.
+
+    The thresholds split the pixels into levels + 1 bands of about equal pixel
+    counts, below the brightest gray level of the image, but always above the
+    darkest one, so a flat image is traced as one layer. Consecutive thresholds
+    with no pixel between them give identical masks, so they are merged into one
+    layer with the opacity of the stacked layers.
+
+    Args:
+        a (np.ndarray): The grayscale image with values in 0..255.
+        levels (int): The maximum number of layers.
+
+    Returns:
+        list[tuple[int, float]]: The threshold and opacity of every layer, with
+            thresholds in increasing order.
+    """
+    histogram = np.bincount(a.ravel(), minlength=256)
+    cumulative = np.cumsum(histogram)
+    targets = cumulative[-1] * np.arange(1, levels + 1) / (levels + 1)
+    populated = np.flatnonzero(histogram)
+    darkest, brightest = int(populated[0]), int(populated[-1])
+    highest = max(brightest, min(darkest + 1, 255))
+    thresholds = np.minimum(np.searchsorted(cumulative, targets) + 1, highest)
+
+    step = 256 / levels
+    layers = list()
+    for color in thresholds.tolist():
+        opacity = layer_opacity(color, step)
+        if layers and not histogram[layers[-1][0] : color].any():
+            previous, previous_opacity = layers.pop()
+            opacity = 1 - (1 - previous_opacity) * (1 - opacity)
+            color = previous
+        layers.append((color, opacity))
+    return layers
+
+
+# converter and grayscale image shared by the layer worker processes
+_worker_converter = None
+_worker_memory = None
+_worker_image = None
+
+
+def _init_layer_worker(converter, name: str, shape: tuple[int, int], dtype: str):
+    """
+    Attaches a layer worker process to the image in shared memory.
+
+    Args:
+        converter (Converter): The converter, without its image.
+        name (str): The name of the shared memory block holding the image.
+        shape (tuple[int, int]): The shape of the image.
+        dtype (str): The dtype of the image.
+    """
+    global _worker_converter, _worker_memory, _worker_image
+    _worker_converter = converter
+    _worker_memory = shared_memory.SharedMemory(name=name)
+    _worker_image = np.ndarray(shape, dtype=dtype, buffer=_worker_memory.buf)
+
+
+def _convert_layer(layer: tuple[int, float]) -> str:
+    """
+    Converts one gray level of the shared image in a layer worker process.
+
+    Args:
+        layer (tuple[int, float]): The threshold and opacity of the layer.
+
+    Returns:
+        str: The SVG path elements of the layer.
+    """
+    color, opacity = layer
+    (color_table,) = threshold_masks(_worker_image, [color])
+    return _worker_converter._format_single_color(color_table, opacity)
+
+
+def _init_path_worker(converter):
+    """
+    Sets up a path worker process.
+
+    Args:
+        converter (Converter): The converter, without its image.
+    """
+    global _worker_converter
+    _worker_converter = converter
+
+
+def _fit_path_batch(paths_list: list[Path]) -> list[_Curve]:
+    """
+    Fits the curves to a batch of paths in a path worker process.
+
+    Args:
+        paths_list (list[Path]): The traced paths.
+
+    Returns:
+        list[_Curve]: The curves fitted to the paths.
+    """
+    return _worker_converter._fit_curves(paths_list)
+
+
+def path_batches(sizes: list[int], batch_points: int) -> list[list[int]]:
+    """
+    Groups paths into the tasks of a worker pool, largest paths first.
+
+    Paths are taken from the largest to the smallest, so the longest tasks
+    start first and the small ones fill the gaps at the end. Consecutive paths
+    are grouped while their total size is at most batch_points, which bounds
+    the overhead of the thousands of specks of a typical image.
+
+    Args:
+        sizes (list[int]): The number of points of every path.
+        batch_points (int): The total number of points up to which paths are
+            grouped into one task.
+
+    Returns:
+        list[list[int]]: The indices of the paths of every task, in the order
+            the tasks should be submitted.
+    """
+    batches = list()
+    batch, batch_size = list(), 0
+    for i in sorted(range(len(sizes)), key=lambda i: -sizes[i]):
+        if batch and batch_size + sizes[i] > batch_points:
+            batches.append(batch)
+            batch, batch_size = list(), 0
+        batch.append(i)
+        batch_size += sizes[i]
+    if batch:
+        batches.append(batch)
+    return batches
+
+
 class Converter:
     """
     A class used to convert an image to an SVG file.
 
     Attributes:
         image (PIL.Image): The input image to be converted.
-        num_colors (int): The number of colors in the image.
         turnpolicy (str): The turn policy for bitmap tracing.
         turdsize (int): The minimum turd size for bitmap tracing.
         alpha_max (float): The alpha max value for curve smoothing.
         is_long_curve (bool): Whether to use long curve optimization.
         opttolerance (float): The optimization tolerance for curve optimization.
         scale (float): The scale factor for the output SVG.
+        tracer (Tracer): The engine used to trace the bitmap paths.
+        packed (bool): Whether to store bitmaps with 8 pixels per byte.
+        despeckle (bool): Whether to remove specks up to turdsize before tracing.
+        tile_size (int): Size of the tiles bitmaps are traced in, or None to trace
+            them whole.
+        split_subtrees (bool): Whether to write every outline with its holes as
+            a separate SVG path.
+        shape_cache (ShapeCache): Cache of the curves fitted to repeated shapes,
+            or None to fit every path from scratch.
+        levels (int): The number of gray levels grayscale images are traced in.
+        adaptive_levels (bool): Whether to pick the gray levels from the image
+            histogram.
+        incremental_layers (bool): Whether to trace only the regions of a gray
+            level which changed since the previous one.
+        jobs (int): The number of processes converting the gray levels, or
+            fitting the curves of a layer.
     """
 
     def __init__(
@@ -61,6 +335,16 @@ class Converter:
         is_long_curve,
         opttolreance,
         scale,
+        tracer=Tracer.LOOKUP_TABLE,
+        packed=False,
+        despeckle=False,
+        tile_size=None,
+        split_subtrees=False,
+        shape_cache_size=0,
+        levels=8,
+        adaptive_levels=False,
+        incremental_layers=False,
+        jobs=1,
     ):
         """
         Initializes the Converter class with the given parameters.
@@ -73,15 +357,73 @@ class Converter:
             is_long_curve (bool): Whether to use long curve optimization.
             opttolerance (float): The optimization tolerance for curve optimization.
             scale (float): The scale factor for the output SVG.
+            tracer (Tracer, optional): The engine used to trace the bitmap paths.
+                Defaults to Tracer.LOOKUP_TABLE.
+            packed (bool, optional): Whether to store bitmaps with 8 pixels per byte.
+                Defaults to False.
+            despeckle (bool, optional): Whether to remove specks up to turdsize
+                before tracing. Defaults to False.
+            tile_size (int, optional): Size of the tiles bitmaps are traced in, which
+                bounds the memory used by tracing. Tiled bitmaps are always traced
+                with Tracer.CRACK_EDGE and without despeckling, so the MAJORITY and
+                MINORITY turn policies, which resolve the turns differently in the
+                other tracers, require tracer to be Tracer.CRACK_EDGE. Defaults to
+                None.
+            split_subtrees (bool, optional): Whether to write every top-level outline
+                with the paths inside of it as a separate SVG path, instead of one
+                path per layer. Defaults to False.
+            shape_cache_size (int, optional): Memory cap in bytes of the cache reusing
+                the curves fitted to translated copies of a path, 0 disables it. The
+                cached curves are fitted at the origin, so their coordinates may differ
+                from the uncached ones by floating point rounding. Defaults to 0.
+            levels (int, optional): The number of gray levels grayscale images are
+                traced in, each traced as a separate layer. Defaults to 8.
+            adaptive_levels (bool, optional): Whether to pick the gray levels from
+                the image histogram, merging the layers with identical masks,
+                instead of spacing them evenly. Defaults to False.
+            incremental_layers (bool, optional): Whether to trace only the regions
+                of a gray level which gained pixels since the previous one, keeping
+                the paths and curves of the others. Not used with tile_size or the
+                MAJORITY and MINORITY turn policies, whose paths depend on the
+                pixels around them. Defaults to False.
+            jobs (int, optional): The number of processes converting the gray levels
+                of grayscale images in parallel, which share the image through shared
+                memory. Binary images, and gray levels traced with
+                incremental_layers, are traced in order, and the curves of their paths
+                are fitted in parallel instead. The output is the same as with one
+                process. Defaults to 1.
+
+        Raises:
+            ValueError: If tile_size is combined with the MAJORITY or MINORITY turn
+                policy and a tracer other than Tracer.CRACK_EDGE.
         """
+        if (
+            tile_size
+            and turnpolicy in (Turnpolicy.MAJORITY, Turnpolicy.MINORITY)
+            and tracer != Tracer.CRACK_EDGE
+        ):
+            raise ValueError(
+                "Tiled tracing with the majority and minority turn policies "
+                "requires the crack-edge tracer."
+            )
         self.image = image
-        self.num_colors = len(image.getcolors(17000000))
         self.turnpolicy = turnpolicy
         self.turdsize = turdsize
         self.alpha_max = alpha_max
         self.is_long_curve = is_long_curve
         self.opttolerance = opttolreance
         self.scale = scale
+        self.tracer = tracer
+        self.packed = packed
+        self.despeckle = despeckle
+        self.tile_size = tile_size
+        self.split_subtrees = split_subtrees
+        self.shape_cache = ShapeCache(shape_cache_size) if shape_cache_size else None
+        self.levels = levels
+        self.adaptive_levels = adaptive_levels
+        self.incremental_layers = incremental_layers
+        self.jobs = jobs
+        self._path_executor = None
 
     def run(self, path):
         """
@@ -90,36 +432,47 @@ class Converter:
         Args:
             path (str): The output path for the SVG file.
         """
-        s = time.process_time()
+        s = time.perf_counter()
         with create_svg(
             path, self.image.width * self.scale, self.image.height * self.scale
         ) as fh:
-            if self.num_colors == 2:
+            if is_bilevel(self.image):
                 print("BINARY")
-                a = np.array(self.image)
-                color_table = np.where(
-                    np.isin(a, np.arange(1)),
-                    0,
-                    1,
-                )
-                self.convert_single_color(color_table, fh)
+                if len(self.image.getbands()) > 1:
+                    # the mask is read from a single band, black stays 0
+                    self.image = ImageOps.grayscale(self.image)
+                color_table = _ImageMask(self.image)
+                with self._path_pool():
+                    self.convert_single_color(color_table, fh)
             else:
                 print("GRAYSCALE")
                 self.image = ImageOps.grayscale(self.image)
                 a = np.array(self.image)
-                step = 32
-                for color in range(0, 256, step):
-                    color_table = np.where(
-                        np.isin(a, np.arange(0, color)),
-                        0,
-                        1,
-                    )
-                    self.convert_single_color(
-                        color_table,
-                        fh,
-                        opacity=(1 - color / 255) * min(1, step / 60),
-                    )
-        e = time.process_time()
+                if self.adaptive_levels:
+                    layers = histogram_layers(a, self.levels)
+                else:
+                    step = 256 / self.levels
+                    layers = [
+                        (round(i * step), layer_opacity(round(i * step), step))
+                        for i in range(self.levels)
+                    ]
+                thresholds = [color for color, _ in layers]
+                masks = threshold_masks(a, thresholds)
+                if self._can_trace_incrementally():
+                    tracer = NestedLayerTracer(self._trace_paths, self._fit_curves)
+                    with self._path_pool():
+                        for (color, opacity), color_table in zip(layers, masks):
+                            if not np.all(color_table):
+                                paths_list, curves = tracer.trace_layer(color_table)
+                                fh.write(
+                                    self._format_layer(paths_list, curves, opacity)
+                                )
+                elif self.jobs > 1:
+                    self._convert_layers_in_pool(a, layers, fh)
+                else:
+                    for (color, opacity), color_table in zip(layers, masks):
+                        self.convert_single_color(color_table, fh, opacity=opacity)
+        e = time.perf_counter()
         print(f"Finished in {round(e - s, 2)} s\n")
 
     def convert_single_color(self, color_table, fh, opacity=1):
@@ -131,56 +484,218 @@ class Converter:
             fh (TextIO): The file handle for the SVG file.
             opacity (float, optional): The opacity for the current layer. Defaults to 1.
         """
-        if not np.all(color_table):
-            bm = Bitmap(color_table)
-            paths_list = bm.generate_paths_list(self.turdsize, self.turnpolicy)
-            polygons = [get_best_polygon(path) for path in paths_list]
-            curves = list()
-            for path, polygon in zip(paths_list, polygons):
-                curve = adjust_vertices(path, polygon)
-                smooth_curve = smooth(curve, self.alpha_max)
-                if not self.is_long_curve:
-                    optimal_curve = optimize_curve(smooth_curve, self.opttolerance)
-                    curves.append(optimal_curve)
-                else:
-                    curves.append(smooth_curve)
-            self._write_path_to_svg(fh, curves, opacity)
+        fh.write(self._format_single_color(color_table, opacity))
+
+    def _format_single_color(self, color_table, opacity=1) -> str:
+        """
+        Converts a single color layer to SVG path elements.
+
+        Args:
+            color_table (np.ndarray): The color table for the layer.
+            opacity (float, optional): The opacity for the layer. Defaults to 1.
+
+        Returns:
+            str: The SVG path elements of the layer, empty if it has no black pixel.
+        """
+        if color_table.all():
+            return ""
+        paths_list = self._trace_paths(color_table)
+        curves = self._fit_curves(paths_list)
+        return self._format_layer(paths_list, curves, opacity)
+
+    @contextmanager
+    def _path_pool(self):
+        """
+        Fits the curves of the paths in a pool of processes while in the context.
 
-    def _write_path_to_svg(
-        self, fp: TextIO, curves: list[_Curve], opacity: float
+        Does nothing if the converter runs a single job.
+        """
+        if self.jobs <= 1:
+            yield
+            return
+        worker = copy.copy(self)
+        worker.image = None
+        worker.jobs = 1
+        with ProcessPoolExecutor(
+            self.jobs, initializer=_init_path_worker, initargs=(worker,)
+        ) as executor:
+            self._path_executor = executor
+            try:
+                yield
+            finally:
+                self._path_executor = None
+
+    def _convert_layers_in_pool(
+        self, a: np.ndarray, layers: list[tuple[int, float]], fh: TextIO
     ) -> None:
         """
-        Writes the SVG path data for the given curves to the file.
+        Converts the gray levels in a pool of processes and writes them in order.
+
+        Args:
+            a (np.ndarray): The grayscale image.
+            layers (list[tuple[int, float]]): The threshold and opacity of every layer.
+            fh (TextIO): The file handle for the SVG file.
+        """
+        worker = copy.copy(self)
+        worker.image = None
+        worker.jobs = 1
+        memory = shared_memory.SharedMemory(create=True, size=max(a.nbytes, 1))
+        try:
+            np.ndarray(a.shape, dtype=a.dtype, buffer=memory.buf)[...] = a
+            with ProcessPoolExecutor(
+                self.jobs,
+                initializer=_init_layer_worker,
+                initargs=(worker, memory.name, a.shape, a.dtype.str),
+            ) as executor:
+                for layer in executor.map(_convert_layer, layers):
+                    fh.write(layer)
+        finally:
+            memory.close()
+            memory.unlink()
+
+    def _can_trace_incrementally(self) -> bool:
+        """
+        Checks whether the gray levels can be traced with NestedLayerTracer.
+
+        Returns:
+            bool: True if incremental tracing is enabled and gives the same paths.
+        """
+        return (
+            self.incremental_layers
+            and not self.tile_size
+            and self.turnpolicy not in (Turnpolicy.MAJORITY, Turnpolicy.MINORITY)
+        )
+
+    def _trace_paths(self, color_table) -> list[Path]:
+        """
+        Traces the paths of a single color layer.
+
+        Args:
+            color_table (np.ndarray): The color table for the layer.
+
+        Returns:
+            list[Path]: The paths of the layer.
+        """
+        if self.tile_size:
+            bm = TiledBitmap(color_table, self.tile_size)
+            return bm.generate_paths_list(self.turdsize, self.turnpolicy)
+        if self.packed:
+            bm = PackedBitmap(color_table)
+        else:
+            # read the whole mask before Bitmap allocates its own copy of it
+            bm = Bitmap(np.asarray(color_table))
+        if self.despeckle:
+            bm.remove_specks(self.turdsize)
+        return bm.generate_paths_list(self.turdsize, self.turnpolicy, self.tracer)
+
+    def _fit_curves(self, paths_list: list[Path]) -> list[_Curve]:
+        """
+        Fits the curves to the paths, through the shape cache if there is one.
+
+        Args:
+            paths_list (list[Path]): The traced paths.
+
+        Returns:
+            list[_Curve]: The curves fitted to the paths.
+        """
+        if self._path_executor is not None and len(paths_list) > 1:
+            return self._fit_curves_in_pool(paths_list)
+        if self.shape_cache is not None:
+            params = (self.alpha_max, self.is_long_curve, self.opttolerance)
+            return [
+                self.shape_cache.get_curve(path, self._fit_curve, params)
+                for path in paths_list
+            ]
+        return [self._fit_curve(path) for path in paths_list]
+
+    def _fit_curves_in_pool(self, paths_list: list[Path]) -> list[_Curve]:
+        """
+        Fits the curves to the paths in the path pool, largest paths first.
+
+        Args:
+            paths_list (list[Path]): The traced paths.
+
+        Returns:
+            list[_Curve]: The curves fitted to the paths, in the order of the paths.
+        """
+        batches = path_batches([len(path) for path in paths_list], _PATH_BATCH_POINTS)
+        futures = [
+            self._path_executor.submit(_fit_path_batch, [paths_list[i] for i in batch])
+            for batch in batches
+        ]
+        curves = [None] * len(paths_list)
+        for batch, future in zip(batches, futures):
+            for i, curve in zip(batch, future.result()):
+                curves[i] = curve
+        return curves
+
+    def _format_layer(
+        self, paths_list: list[Path], curves: list[_Curve], opacity: float
+    ) -> str:
+        """
+        Formats the curves of a layer as one or many SVG path elements.
+
+        Args:
+            paths_list (list[Path]): The traced paths.
+            curves (list[_Curve]): The curves fitted to the paths.
+            opacity (float): The opacity for the layer.
+
+        Returns:
+            str: The SVG path elements of the layer.
+        """
+        if self.split_subtrees:
+            return "".join(
+                self._format_path([curves[i] for i in subtree], opacity)
+                for subtree in get_subtrees(build_path_tree(paths_list))
+            )
+        return self._format_path(curves, opacity)
+
+    def _fit_curve(self, path) -> _Curve:
+        """
+        Fits the optimal polygon to the path and smooths it into a curve.
+
+        Args:
+            path (Path): The traced path.
+
+        Returns:
+            _Curve: The curve fitted to the path.
+        """
+        polygon = get_best_polygon(path)
+        curve = adjust_vertices(path, polygon)
+        smooth_curve = smooth(curve, self.alpha_max)
+        if not self.is_long_curve:
+            return optimize_curve(smooth_curve, self.opttolerance)
+        return smooth_curve
+
+    def _format_path(self, curves: list[_Curve], opacity: float) -> str:
+        """
+        Formats the SVG path element for the given curves.
 
         Args:
-            fp (TextIO): The file handle for the SVG file.
             curves (list[_Curve]): The list of curves to write.
             opacity (float): The opacity for the current layer.
+
+        Returns:
+            str: The SVG path element.
         """
 
         parts = list()
         for curve in curves:
-            first_segment = curve.segments[-1].c[2]
+            control_points = curve.c.tolist()
+            first_segment = control_points[-1][2]
             parts.append(
                 f"M{first_segment[0] * self.scale},{first_segment[1] * self.scale}"
             )
-            for segment in curve.segments:
-                if segment.tag == POTRACE_CURVETO:
-                    a = segment.c[0]
-                    b = segment.c[1]
-                    c = segment.c[2]
+            for tag, (a, b, c) in zip(curve.tag.tolist(), control_points):
+                if tag == POTRACE_CURVETO:
                     parts.append(
                         f"""C{a[0] * self.scale} {a[1] * self.scale},
                                   {b[0] * self.scale} {b[1] * self.scale}, {c[0] * self.scale} {c[1] * self.scale}"""
                     )
                 else:
-                    a = segment.c[1]
-                    b = segment.c[2]
                     parts.append(
-                        f"L{a[0] * self.scale} {a[1] * self.scale} {b[0] * self.scale},{b[1] * self.scale}"
+                        f"L{b[0] * self.scale} {b[1] * self.scale} {c[0] * self.scale},{c[1] * self.scale}"
                     )
             parts.append("z")
 
-        fp.write(
-            f'<path stroke="none" opacity="{opacity} " fill-rule="evenodd" d="{"".join(parts)}"/>'
-        )
+        return f'<path stroke="none" opacity="{opacity} " fill-rule="evenodd" d="{"".join(parts)}"/>'
@@ -6,6 +6,13 @@ import math
 
 
 OptiT = namedtuple("OptiT", ["pen", "c", "alpha", "s"])
+OptimizationContext = namedtuple(
+    "OptimizationContext",
+    [
+        "n", "vertices", "ends", "alphas", "lengths", "end_lengths", "convexity", "areas",
+        "vertex_array", "end_array", "alpha_array", "length_array", "end_length_array",
+    ],
+)
 
 POTRACE_CURVETO = 1
 POTRACE_CORNER = 2
@@ -42,7 +49,7 @@ def dpara(p0: tuple[float, float], p1, p2) -> float:
     y1 = p1[1] - p0[1]
     x2 = p2[0] - p0[0]
     y2 = p2[1] - p0[1]
-    return np.cross([x1, y1], [x2, y2]).item()
+    return x1 * y2 - x2 * y1
 
 
 def cprod(p0, p1, p2, p3) -> float:
@@ -77,7 +84,7 @@ def iprod(p0, p1, p2, p3=None) -> float:
     return x1 * x2 + y1 * y2
 
 
-def bezier(t: float, p0, p1, p2, p3) -> tuple[float, float]:
+def bezier(t, p0, p1, p2, p3) -> tuple:
     """Calculates a point of a bezier curve specified by control points and t param.
 
     Paper:
@@ -86,23 +93,23 @@ def bezier(t: float, p0, p1, p2, p3) -> tuple[float, float]:
 
     Args:
         p0, p1, p2, p3: Bezier curve control points
-        t: Curve parameter
+        t: Curve parameter, or an array of parameters
 
     Returns:
-        Point
+        Point, or a tuple of arrays with the coordinates of the points
     """
     s = 1 - t
     x = (
-        pow(s, 3) * p0[0]
-        + 3 * pow(s, 2) * t * p1[0]
-        + 3 * pow(t, 2) * s * p2[0]
-        + pow(t, 3) * p3[0]
+        s * s * s * p0[0]
+        + 3 * s * s * t * p1[0]
+        + 3 * t * t * s * p2[0]
+        + t * t * t * p3[0]
     )
     y = (
-        pow(s, 3) * p0[1]
-        + 3 * pow(s, 2) * t * p1[1]
-        + 3 * pow(t, 2) * s * p2[1]
-        + pow(t, 3) * p3[1]
+        s * s * s * p0[1]
+        + 3 * s * s * t * p1[1]
+        + 3 * t * t * s * p2[1]
+        + t * t * t * p3[1]
     )
     return x, y
 
@@ -131,7 +138,8 @@ def tangent(p0, p1, p2, p3, q0, q1) -> float:
     if a == 0 or delta < 0:
         return -1
 
-    root1, root2 = np.roots([a, b, c])
+    root1 = (-b + math.sqrt(delta)) / (2 * a)
+    root2 = (-b - math.sqrt(delta)) / (2 * a)
     if 0 <= root1 <= 1:
         return root1
     elif 0 <= root2 <= 1:
@@ -139,8 +147,44 @@ def tangent(p0, p1, p2, p3, q0, q1) -> float:
     return -1
 
 
+def tangents(p0, p1, p2, p3, q0: np.ndarray, q1: np.ndarray) -> np.ndarray:
+    """Calculates tangent for many edges at once
+
+    Args:
+        p0, p1, p2, p3: control points of Bezier curve
+        q0: array of shape (m, 2) with the start points of the edges
+        q1: array of shape (m, 2) with the end points of the edges
+
+    Returns:
+        Array with the value of t for every edge, -1 for the edges without
+        solution in [0..1].
+    """
+
+    x2 = q1[:, 0] - q0[:, 0]
+    y2 = q1[:, 1] - q0[:, 1]
+    A = (p1[0] - p0[0]) * y2 - x2 * (p1[1] - p0[1])
+    B = (p2[0] - p1[0]) * y2 - x2 * (p2[1] - p1[1])
+    C = (p3[0] - p2[0]) * y2 - x2 * (p3[1] - p2[1])
+
+    a = A - 2 * B + C
+    b = -2 * A + 2 * B
+    c = A
+    delta = b * b - 4 * a * c
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        root1 = (-b + np.sqrt(delta)) / (2 * a)
+        root2 = (-b - np.sqrt(delta)) / (2 * a)
+    solvable = (a != 0) & (delta >= 0)
+    return np.where(
+        solvable & (0 <= root1) & (root1 <= 1),
+        root1,
+        np.where(solvable & (0 <= root2) & (root2 <= 1), root2, -1.0),
+    )
+
+
 def calculate_penalty_edges_tangency(
-    curve: _Curve, start_index: int, end_index: int, opttolerance: float, p0, p1, p2, p3
+    curve: _Curve, start_index: int, end_index: int, opttolerance: float, p0, p1, p2, p3,
+    context: OptimizationContext = None,
 ) -> float:
     """Calculates part of penalty connected with tangency with edges
 
@@ -150,42 +194,44 @@ def calculate_penalty_edges_tangency(
         end_index: index of last segment of curve part for which we want to calculate penalty
         opttolerance: maximum deviation for which we will still perform replacing
         p0, p1, p2, p3: control points of new potential curve
+        context: values precalculated for the curve, calculated if not given
 
 
     Returns:
         Value of the penalty
     """
 
-    penalty = 0
-
-    current_index = start_index
-    while current_index != end_index:
-        next_index = (current_index + 1) % curve.n
-        t = tangent(
-            p0, p1, p2, p3, curve[current_index].vertex, curve[next_index].vertex
-        )
-        if t < -0.5:
-            return None
-        pt = bezier(t, p0, p1, p2, p3)
-        d = calculate_distance(curve[current_index].vertex, curve[next_index].vertex)
-        if d == 0.0:  # /* this should never happen */
-            return None
-        d1 = dpara(curve[current_index].vertex, curve[next_index].vertex, pt) / d
-        if math.fabs(d1) > opttolerance:
-            return None
-        if (
-            iprod(curve[current_index].vertex, curve[next_index].vertex, pt) < 0
-            or iprod(curve[next_index].vertex, curve[current_index].vertex, pt) < 0
-        ):
-            return 1
-        penalty += d1**2
-        current_index = next_index
+    if context is None:
+        context = precalculate_context(curve)
+
+    # all edges of the span at once, the arrays of the context repeat the curve twice
+    stop = start_index + (end_index - start_index) % context.n
+    q0 = context.vertex_array[start_index:stop]
+    q1 = context.vertex_array[start_index + 1:stop + 1]
+    d = context.length_array[start_index:stop]
+
+    t = tangents(p0, p1, p2, p3, q0, q1)
+    x, y = bezier(t, p0, p1, p2, p3)
+    x1 = q1[:, 0] - q0[:, 0]
+    y1 = q1[:, 1] - q0[:, 1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1 = (x1 * (y - q0[:, 1]) - (x - q0[:, 0]) * y1) / d
+
+    rejected = (t < -0.5) | (d == 0.0) | (np.fabs(d1) > opttolerance)
+    outside = (x1 * (x - q0[:, 0]) + y1 * (y - q0[:, 1]) < 0) | (
+        -x1 * (x - q1[:, 0]) - y1 * (y - q1[:, 1]) < 0
+    )
+    failed = rejected | outside
+    if failed.any():
+        # the first failing edge decides, like in a check of the edges one by one
+        return None if rejected[failed.argmax()] else 1
 
-    return penalty
+    return sum((d1 * d1).tolist())
 
 
 def calculate_penalty_corners(
-    curve: _Curve, start_index: int, end_index: int, opttolerance: float, p0, p1, p2, p3
+    curve: _Curve, start_index: int, end_index: int, opttolerance: float, p0, p1, p2, p3,
+    context: OptimizationContext = None,
 ) -> float:
     """Calculates part of penalty connected with tangency with corners
 
@@ -195,75 +241,74 @@ def calculate_penalty_corners(
         end_index: index of last segment of curve part for which we want to calculate penalty
         opttolerance: maximum deviation for which we will still perform replacing
         p0, p1, p2, p3: control points of new potential curve
+        context: values precalculated for the curve, calculated if not given
 
     Returns:
         Value of the penalty
     """
 
-    penalty = 0
-
-    current_index = start_index
-    while current_index != end_index:
-        next_index = (current_index + 1) % curve.n
-        t = tangent(p0, p1, p2, p3, curve[current_index].c[2], curve[next_index].c[2])
-        if t < -0.5:
-            return None
-        pt = bezier(t, p0, p1, p2, p3)
-        d = calculate_distance(curve[current_index].c[2], curve[next_index].c[2])
-        if d == 0.0:  # this should never happen
-            return None
-        d1 = dpara(curve[current_index].c[2], curve[next_index].c[2], pt) / d
-        d2 = (
-            dpara(
-                curve[current_index].c[2],
-                curve[next_index].c[2],
-                curve[next_index].vertex,
-            )
-            / d
-        )
-        d2 *= 0.75 * curve[next_index].alpha
-        if d2 < 0:
-            d1 = -d1
-            d2 = -d2
-        if d1 < d2 - opttolerance:
-            return None
-        if d1 < d2:
-            penalty += (d1 - d2) ** 2
-        current_index = next_index
+    if context is None:
+        context = precalculate_context(curve)
+
+    # all corners of the span at once, the arrays of the context repeat the curve twice
+    stop = start_index + (end_index - start_index) % context.n
+    q0 = context.end_array[start_index:stop]
+    q1 = context.end_array[start_index + 1:stop + 1]
+    vertices = context.vertex_array[start_index + 1:stop + 1]
+    d = context.end_length_array[start_index:stop]
+
+    t = tangents(p0, p1, p2, p3, q0, q1)
+    x, y = bezier(t, p0, p1, p2, p3)
+    x1 = q1[:, 0] - q0[:, 0]
+    y1 = q1[:, 1] - q0[:, 1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1 = (x1 * (y - q0[:, 1]) - (x - q0[:, 0]) * y1) / d
+        d2 = (x1 * (vertices[:, 1] - q0[:, 1]) - (vertices[:, 0] - q0[:, 0]) * y1) / d
+    d2 *= 0.75 * context.alpha_array[start_index + 1:stop + 1]
+    flipped = d2 < 0
+    d1 = np.where(flipped, -d1, d1)
+    d2 = np.where(flipped, -d2, d2)
+
+    if ((t < -0.5) | (d == 0.0) | (d1 < d2 - opttolerance)).any():
+        return None
 
-    return penalty
+    below = d1 < d2
+    return sum(((d1[below] - d2[below]) ** 2).tolist())
 
 
-def check_if_smaller_than_179(curve: _Curve, start_segment_idx: int, end_segment_idx: int) -> bool:
+def check_if_smaller_than_179(
+    curve: _Curve, start_segment_idx: int, end_segment_idx: int, context: OptimizationContext = None
+) -> bool:
     """Checks if condition of not exceeding 179 degrees in one curve is satisfied for given segments
 
     Args:
         curve: curve for which subset we want to perform check
         start_segment_idx: index of first segment of curve part for which we want to perform check
         end_segment_idx: index of last segment of curve part for which we want to perform check
+        context: values precalculated for the curve, calculated if not given
 
 
     Returns:
         True if condition is satisfied, False otherwise
     """
 
-    end_segment_plus_one_idx = (end_segment_idx + 1) % curve.n
-    start_segment_plus_one_idx = (start_segment_idx + 1) % curve.n
+    if context is None:
+        context = precalculate_context(curve)
+    vertices = context.vertices
 
-    d = calculate_distance(
-        curve[start_segment_idx].vertex, curve[start_segment_plus_one_idx].vertex
-    )
+    end_segment_plus_one_idx = (end_segment_idx + 1) % context.n
+    start_segment_plus_one_idx = (start_segment_idx + 1) % context.n
+
+    d = context.lengths[start_segment_idx]
     if (
         iprod(
-            curve[start_segment_idx].vertex,
-            curve[start_segment_plus_one_idx].vertex,
-            curve[end_segment_idx].vertex,
-            curve[end_segment_plus_one_idx].vertex,
+            vertices[start_segment_idx],
+            vertices[start_segment_plus_one_idx],
+            vertices[end_segment_idx],
+            vertices[end_segment_plus_one_idx],
         )
         < d
-        * calculate_distance(
-            curve[end_segment_idx].vertex, curve[end_segment_plus_one_idx].vertex
-        )
+        * context.lengths[end_segment_idx]
         * COS179
     ):
         return False
@@ -271,7 +316,8 @@ def check_if_smaller_than_179(curve: _Curve, start_segment_idx: int, end_segment
 
 
 def check_if_same_convexity(
-    curve: _Curve, convexity: int, convexity_precalculated: list[int], start_segment_idx: int, end_segment_idx: int
+    curve: _Curve, convexity: int, convexity_precalculated: list[int], start_segment_idx: int, end_segment_idx: int,
+    context: OptimizationContext = None,
 ) -> bool:
     """Checks if condition of the same convexity is satisfied for given segments
 
@@ -281,24 +327,29 @@ def check_if_same_convexity(
         convexity_precalculated: precalculated convexity to speed up calculations
         start_segment_idx: index of first segment of curve part for which we want to perform check
         end_segment_idx: index of last segment of curve part for which we want to perform check
+        context: values precalculated for the curve, calculated if not given
 
 
     Returns:
         True if condition is satisfied, False otherwise
     """
 
-    end_segment_idx_plus_one = (end_segment_idx + 1) % curve.n
-    start_segment_plus_one_idx = (start_segment_idx + 1) % curve.n
+    if context is None:
+        context = precalculate_context(curve)
+    vertices = context.vertices
+
+    end_segment_idx_plus_one = (end_segment_idx + 1) % context.n
+    start_segment_plus_one_idx = (start_segment_idx + 1) % context.n
 
     if convexity_precalculated[end_segment_idx] != convexity:
         return False
     if (
         np.sign(
             cprod(
-                curve[start_segment_idx].vertex,
-                curve[start_segment_plus_one_idx].vertex,
-                curve[end_segment_idx].vertex,
-                curve[end_segment_idx_plus_one].vertex,
+                vertices[start_segment_idx],
+                vertices[start_segment_plus_one_idx],
+                vertices[end_segment_idx],
+                vertices[end_segment_idx_plus_one],
             )
         )
         != convexity
@@ -307,27 +358,33 @@ def check_if_same_convexity(
     return True
 
 
-def check_necessary_conditions(curve: _Curve, start_segment_idx: int, end_segment_idx: int) -> bool:
+def check_necessary_conditions(
+    curve: _Curve, start_segment_idx: int, end_segment_idx: int, context: OptimizationContext = None
+) -> bool:
     """Checks if all necessary conditions to allow merging curves into one are satisfied
 
     Args:
         curve: curve for which subset we want to perform checks
         start_segment_idx: index of first segment of curve part for which we want to perform checks
         end_segment_idx: index of last segment of curve part for which we want to perform checks
+        context: values precalculated for the curve, calculated if not given
 
     Returns:
         True if all conditions is satisfied, False otherwise
     """
 
+    if context is None:
+        context = precalculate_context(curve)
+
     if (
         start_segment_idx == end_segment_idx
     ):  # sanity - a full loop can never be an opticurve
         return False
 
     current_segment = start_segment_idx
-    next_segment = (current_segment + 1) % curve.n
+    next_segment = (current_segment + 1) % context.n
 
-    convexity_precalculated = precalculate_convexity(curve)
+    convexity_precalculated = context.convexity
     convexity = convexity_precalculated[next_segment]
 
     if convexity == 0:  # there is corner here
@@ -335,12 +392,12 @@ def check_necessary_conditions(curve: _Curve, start_segment_idx: int, end_segmen
 
     current_segment = next_segment
     while current_segment != end_segment_idx:
-        next_segment = (current_segment + 1) % curve.n
+        next_segment = (current_segment + 1) % context.n
         if not check_if_same_convexity(
-            curve, convexity, convexity_precalculated, start_segment_idx, next_segment
+            curve, convexity, convexity_precalculated, start_segment_idx, next_segment, context
         ):
             return False
-        if not check_if_smaller_than_179(curve, start_segment_idx, next_segment):
+        if not check_if_smaller_than_179(curve, start_segment_idx, next_segment, context):
             return False
 
         current_segment = next_segment
@@ -348,30 +405,35 @@ def check_necessary_conditions(curve: _Curve, start_segment_idx: int, end_segmen
     return True
 
 
-def calculate_curve_area(curve: _Curve, start_segment_idx: int, end_segment_idx: int) -> float:
+def calculate_curve_area(
+    curve: _Curve, start_segment_idx: int, end_segment_idx: int, context: OptimizationContext = None
+) -> float:
     """Calculate are under given segments of curve
 
     Args:
         curve: curve for which subset we want to calculate area
         start_segment_idx: index of first segment of curve part for which we want to calculate area
         end_segment_idx: index of last segment of curve part for which we want to calculate area
+        context: values precalculated for the curve, calculated if not given
 
 
     Returns:
         Area under given segments of curve
     """
 
-    precalculated_areas = precalculate_areas(curve)
+    if context is None:
+        context = precalculate_context(curve)
+    precalculated_areas = context.areas
 
     area = precalculated_areas[end_segment_idx] - precalculated_areas[start_segment_idx]
     area -= (
         dpara(
-            curve[0].vertex, curve[start_segment_idx].c[2], curve[end_segment_idx].c[2]
+            context.vertices[0], context.ends[start_segment_idx], context.ends[end_segment_idx]
         )
         / 2
     )
     if start_segment_idx >= end_segment_idx:
-        area += precalculated_areas[curve.n]
+        area += precalculated_areas[context.n]
     return area
 
 
@@ -398,6 +460,8 @@ def calculate_optimization_penalty(
     start_segment_idx: int,
     end_segment_idx: int,
     opttolerance: float,
+    context: OptimizationContext = None,
+    check_conditions: bool = True,
 ) -> OptiT:
     """Calculate penalty of optimized curve part between two segments
 
@@ -406,29 +470,36 @@ def calculate_optimization_penalty(
         start_segment_idx: index of first segment of curve part for which we want to calculate penalty
         end_segment_idx: index of last segment of curve part for which we want to calculate penalty
         opttolerance: maximum deviation for which we will still perform replacing
+        context: values precalculated for the curve, calculated if not given
+        check_conditions: whether to check the necessary conditions, which can be
+            skipped for segments already known to satisfy them
 
     Returns:
         Penalty of calculated optimal curve or None if cannot create optimal curve
         that will fit the requirements
     """
 
-    n_of_segments = curve.n
+    if context is None:
+        context = precalculate_context(curve)
+    n_of_segments = context.n
 
     # check convexity, corner-freeness, and maximum bend < 179 degrees
     current_segment = start_segment_idx
     start_segment_plus_one_idx = (start_segment_idx + 1) % n_of_segments
 
-    if not check_necessary_conditions(curve, start_segment_idx, end_segment_idx):
+    if check_conditions and not check_necessary_conditions(
+        curve, start_segment_idx, end_segment_idx, context
+    ):
         return None
 
     # the curve we're working in:
-    p0 = curve[start_segment_idx % n_of_segments].c[2]
-    p1 = curve[start_segment_plus_one_idx].vertex
-    p2 = curve[end_segment_idx % n_of_segments].vertex
-    p3 = curve[end_segment_idx % n_of_segments].c[2]
+    p0 = context.ends[start_segment_idx % n_of_segments]
+    p1 = context.vertices[start_segment_plus_one_idx]
+    p2 = context.vertices[end_segment_idx % n_of_segments]
+    p3 = context.ends[end_segment_idx % n_of_segments]
 
     # determine its area
-    area = calculate_curve_area(curve, start_segment_idx, end_segment_idx)
+    area = calculate_curve_area(curve, start_segment_idx, end_segment_idx, context)
 
     # find intersection o of p0p1 and p2p3. Let t,s such that
     # o =interval(t,p0,p1) = interval(s,p3,p2). Let A be the area of the
@@ -462,7 +533,7 @@ def calculate_optimization_penalty(
     # check tangency with edges
     current_segment = (start_segment_idx + 1) % n_of_segments
     pen_edges = calculate_penalty_edges_tangency(
-        curve, current_segment, end_segment_idx, opttolerance, p0, p1, p2, p3
+        curve, current_segment, end_segment_idx, opttolerance, p0, p1, p2, p3, context
     )
     if pen_edges is None:
         return None
@@ -470,7 +541,7 @@ def calculate_optimization_penalty(
     # /* check corners */
     current_segment = start_segment_idx
     pen_corners = calculate_penalty_corners(
-        curve, current_segment, end_segment_idx, opttolerance, p0, p1, p2, p3
+        curve, current_segment, end_segment_idx, opttolerance, p0, p1, p2, p3, context
     )
     if pen_corners is None:
         return None
@@ -490,16 +561,18 @@ def precalculate_convexity(curve: _Curve) -> list[int]:
     """
 
     convexity = list()
+    tags = curve.tag.tolist()
+    vertices = curve.vertex.tolist()
 
     # pre-calculate convexity: +1 = right turn, -1 = left turn, 0 = corner
     for i in range(curve.n):
-        if curve[i].tag == POTRACE_CURVETO:
+        if tags[i] == POTRACE_CURVETO:
             convexity.append(
                 np.sign(
                     dpara(
-                        curve[(i - 1) % curve.n].vertex,
-                        curve[i].vertex,
-                        curve[(i + 1) % curve.n].vertex,
+                        vertices[(i - 1) % curve.n],
+                        vertices[i],
+                        vertices[(i + 1) % curve.n],
                     )
                 )
             )
@@ -520,24 +593,122 @@ def precalculate_areas(curve: _Curve) -> list[float]:
 
     area = 0.0
     areac = [0.0]
-    p0 = curve[0].vertex
+    tags = curve.tag.tolist()
+    alphas = curve.alpha.tolist()
+    vertices = curve.vertex.tolist()
+    ends = curve.c[:, 2].tolist()
+    p0 = vertices[0]
     for i in range(curve.n):
         i1 = (i + 1) % curve.n
-        if curve[i1].tag == POTRACE_CURVETO:
-            alpha = curve[i1].alpha
+        if tags[i1] == POTRACE_CURVETO:
+            alpha = alphas[i1]
             area += (
                 0.3
                 * alpha
                 * (4 - alpha)
-                * dpara(curve[i].c[2], curve[i1].vertex, curve[i1].c[2])
+                * dpara(ends[i], vertices[i1], ends[i1])
                 / 2
             )
-            area += dpara(p0, curve[i].c[2], curve[i1].c[2]) / 2
+            area += dpara(p0, ends[i], ends[i1]) / 2
         areac.append(area)
 
     return areac
 
 
+def precalculate_context(curve: _Curve) -> OptimizationContext:
+    """Precalculate the values shared by all of the penalty calculations of a curve
+
+    Args:
+        curve: curve to precalculate values for
+
+    Returns:
+        Context with the vertices, segment end points and alphas of the curve as lists,
+        lengths of the edges between the vertices and between the end points,
+        convexity and cumulative areas, followed by the vertices, end points, alphas
+        and lengths as arrays repeating the curve twice, so that any span of segments
+        is a slice
+    """
+
+    n = curve.n
+    vertices = curve.vertex.tolist()
+    ends = curve.c[:, 2].tolist()
+    lengths = [calculate_distance(vertices[i], vertices[(i + 1) % n]) for i in range(n)]
+    end_lengths = [calculate_distance(ends[i], ends[(i + 1) % n]) for i in range(n)]
+
+    return OptimizationContext(
+        n,
+        vertices,
+        ends,
+        curve.alpha.tolist(),
+        lengths,
+        end_lengths,
+        precalculate_convexity(curve),
+        precalculate_areas(curve),
+        np.concatenate((curve.vertex, curve.vertex)),
+        np.concatenate((curve.c[:, 2], curve.c[:, 2])),
+        np.concatenate((curve.alpha, curve.alpha)),
+        np.array(lengths * 2),
+        np.array(end_lengths * 2),
+    )
+
+
+def precalculate_reach(curve: _Curve, context: OptimizationContext = None) -> list[int]:
+    """Precalculate for every last segment the first start segment that still satisfies
+    the necessary conditions together with all of the start segments after it
+
+    Args:
+        curve: curve to precalculate reach for
+        context: values precalculated for the curve, calculated if not given
+
+    Returns:
+        List reach of length n + 1, such that check_necessary_conditions holds for start segment i
+        and last segment j % n exactly when reach[j] <= i <= j - 2, for segments visited by optimize_curve
+    """
+
+    if context is None:
+        context = precalculate_context(curve)
+    n = context.n
+
+    # The checks of check_if_same_convexity and check_if_smaller_than_179 are repeated
+    # inline, with the same arithmetic, on the edges between consecutive vertices
+    vertices = context.vertices
+    lengths = context.lengths
+    convexity_precalculated = context.convexity
+    edges = [
+        (vertices[(k + 1) % n][0] - vertices[k][0], vertices[(k + 1) % n][1] - vertices[k][1])
+        for k in range(n)
+    ]
+
+    # furthest[i] is the last segment, in indexes growing past n, such that the conditions
+    # hold between start segment i and every segment up to it
+    furthest = [0] * n
+    for i in range(n - 1):
+        convexity = convexity_precalculated[i + 1]
+        x1, y1 = edges[i]
+        k = i + 1
+        while convexity != 0 and k < n:
+            following = (k + 1) % n
+            x2, y2 = edges[following]
+            cross = x1 * y2 - x2 * y1
+            if (
+                convexity_precalculated[following] != convexity
+                or (cross > 0) - (cross < 0) != convexity
+                or x1 * x2 + y1 * y2 < lengths[i] * lengths[following] * COS179
+            ):
+                break
+            k += 1
+        furthest[i] = k
+
+    reach = [0] * (n + 1)
+    for j in range(1, n + 1):
+        i = j - 2
+        while i >= 0 and i != j % n and j <= furthest[i]:
+            i -= 1
+        reach[j] = i + 1
+
+    return reach
+
+
 def optimize_curve(curve: _Curve, opttolerance: float) -> _Curve:
     """Optimize the path p, replacing sequences of Bezier segments by a
     single segment when possible.
@@ -555,6 +726,9 @@ def optimize_curve(curve: _Curve, opttolerance: float) -> _Curve:
     length = [0] * (n_of_segments + 1)  # /* len[m+1] */
     opt = [None] * (n_of_segments + 1)  # /* opt[m+1] */
 
+    context = precalculate_context(curve)
+    reach = precalculate_reach(curve, context)
+
     pt[0] = -1
     pen[0] = 0
     length[0] = 0
@@ -564,12 +738,17 @@ def optimize_curve(curve: _Curve, opttolerance: float) -> _Curve:
         pt[curr_last_segment] = curr_last_segment - 1
         pen[curr_last_segment] = pen[curr_last_segment - 1]
         length[curr_last_segment] = length[curr_last_segment - 1] + 1
-        for curr_start_segment in range(curr_last_segment - 2, -1, -1):
+        # start segments before reach fail the necessary conditions
+        for curr_start_segment in range(
+            curr_last_segment - 2, reach[curr_last_segment] - 1, -1
+        ):
             opti_curve = calculate_optimization_penalty(
                 curve,
                 curr_start_segment,
                 curr_last_segment % n_of_segments,
                 opttolerance,
+                context,
+                check_conditions=False,
             )
             if opti_curve is None:
                 break
@@ -0,0 +1,130 @@
+from typing import Callable
+
+import cv2
+import numpy as np
+
+from vectorvision.path_decomposition import Path
+from vectorvision.vertex_adjustment import _Curve
+
+
+def _top_level_regions(black: np.ndarray) -> np.ndarray:
+    """Labels every outline of a bitmap together with everything inside of it.
+
+    The white 4-connected components which do not reach the border are holes.
+    Filled with black, together with the 8-connected black components they
+    join every top-level outline with its holes and the outlines nested in
+    them into one region.
+
+    Args:
+        black: bitmap with True for the black pixels
+
+    Returns:
+        Array of the shape of the bitmap with the region label of every pixel,
+        0 for the white pixels outside of all of the outlines.
+    """
+    height, width = black.shape
+    white = np.ones((height + 2, width + 2), dtype=np.uint8)
+    white[1:-1, 1:-1] = ~black
+    _, white_labels = cv2.connectedComponents(white, connectivity=4)
+    filled = (white_labels[1:-1, 1:-1] != white_labels[0, 0]).astype(np.uint8)
+    _, labels = cv2.connectedComponents(filled, connectivity=8)
+    return labels
+
+
+def _start_pixels(paths: list[Path]) -> tuple[np.ndarray, np.ndarray]:
+    """Finds the pixels the paths were started from by the tracer.
+
+    Args:
+        paths: list of paths given by generate_paths_list
+
+    Returns:
+        Rows and columns of the pixels.
+    """
+    first = np.array([path[0] for path in paths], dtype=np.int64).reshape(-1, 2)
+    return first[:, 1] - 1, first[:, 0]
+
+
+class NestedLayerTracer:
+    """Traces threshold layers which only grow, reusing the unchanged outlines.
+
+    Every layer of a grayscale image holds all of the black pixels of the
+    darker layers. An outline whose region, the outline with its holes and
+    everything inside of them, gained no black pixel since the previous layer
+    has the same paths, which are kept together with their curves. Only the
+    regions with new pixels are traced and fitted again. The paths are merged
+    in the order of their start pixels, which is the order of a trace of the
+    whole layer, so the result is the same as tracing every layer from scratch.
+
+    Paths depend only on the pixels of their region, so this does not hold for
+    Turnpolicy.MAJORITY and Turnpolicy.MINORITY, which look around the turns.
+
+    Attributes:
+        trace (Callable[[np.ndarray], list[Path]]): function tracing the paths
+            of a layer, 0 for black and 1 for white.
+        fit (Callable[[list[Path]], list[_Curve]]): function fitting the curves
+            to a list of paths.
+        traced_regions (int): number of regions traced so far.
+        reused_regions (int): number of regions kept from the previous layers.
+    """
+
+    def __init__(
+        self,
+        trace: Callable[[np.ndarray], list[Path]],
+        fit: Callable[[list[Path]], list[_Curve]],
+    ):
+        self.trace = trace
+        self.fit = fit
+        self.traced_regions = 0
+        self.reused_regions = 0
+        self._black = None
+        self._paths = list()
+        self._curves = list()
+
+    def trace_layer(self, color_table: np.ndarray) -> tuple[list[Path], list[_Curve]]:
+        """Traces the next layer and fits its curves.
+
+        Args:
+            color_table: the layer, 0 for black and 1 for white, holding all of
+                the black pixels of the previous layer
+
+        Returns:
+            The paths of the layer and the curves fitted to them, in the order
+            of generate_paths_list.
+        """
+        black = color_table == 0
+        labels = _top_level_regions(black)
+        dirty = np.zeros(labels.max() + 1, dtype=bool)
+        if self._black is None or self._black.shape != black.shape:
+            dirty[1:] = True
+        elif (self._black & ~black).any():
+            raise ValueError("Layer must hold all black pixels of the previous one.")
+        else:
+            dirty[labels[black & ~self._black]] = True
+
+        kept_paths, kept_curves = list(), list()
+        if self._paths:
+            rows, columns = _start_pixels(self._paths)
+            kept = ~dirty[labels[rows, columns]]
+            kept_paths = [path for path, keep in zip(self._paths, kept) if keep]
+            kept_curves = [curve for curve, keep in zip(self._curves, kept) if keep]
+
+        traced_paths, traced_curves = list(), list()
+        if dirty.any():
+            changed = ~(black & dirty[labels])
+            traced_paths = self.trace(changed)
+            traced_curves = self.fit(traced_paths)
+        self.traced_regions += int(np.count_nonzero(dirty))
+        self.reused_regions += int(np.count_nonzero(~dirty[1:]))
+
+        paths = kept_paths + traced_paths
+        curves = kept_curves + traced_curves
+        if kept_paths and traced_paths:
+            rows, columns = _start_pixels(paths)
+            order = np.lexsort((columns, rows)).tolist()
+            paths = [paths[i] for i in order]
+            curves = [curves[i] for i in order]
+
+        self._black = black
+        self._paths = paths
+        self._curves = curves
+        return paths, curves
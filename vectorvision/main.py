@@ -2,7 +2,7 @@ import os
 import argparse
 from PIL import Image
 from vectorvision.Converter import Converter
-from vectorvision.path_decomposition import Turnpolicy
+from vectorvision.path_decomposition import Tracer, Turnpolicy
 
 
 def validate_input(args):
@@ -24,6 +24,22 @@ def validate_input(args):
     if ext not in [".jpg", ".jpeg", ".bmp", ".png", ".pbm"]:
         print(f"File format: {ext} not supported.")
         return False
+    if not 1 <= args.levels <= 256:
+        print("Number of levels must be between 1 and 256.")
+        return False
+    if args.jobs < 1:
+        print("Number of jobs must be positive.")
+        return False
+    if args.tile_size is not None and args.tile_size < 1:
+        print("Tile size must be positive.")
+        return False
+    if (
+        args.tile_size is not None
+        and args.turnpolicy in ("majority", "minority")
+        and args.tracer != "crack-edge"
+    ):
+        print("Tiles with majority and minority turnpolicy need crack-edge tracer.")
+        return False
     if args.output_path:
         name, ext = os.path.splitext(args.output_path)
         if ext != ".svg":
@@ -46,6 +62,12 @@ def main() -> None:
         "minority": Turnpolicy.MINORITY,
     }
 
+    tracer_mapping = {
+        "lookup": Tracer.LOOKUP_TABLE,
+        "reference": Tracer.REFERENCE,
+        "crack-edge": Tracer.CRACK_EDGE,
+    }
+
     parser.add_argument("-i", "--input-path", type=str, required=True)
     parser.add_argument("-o", "--output-path", type=str, required=False)
     parser.add_argument(
@@ -56,6 +78,74 @@ def main() -> None:
         choices=["black", "white", "left", "right", "majority", "minority"],
         help="policy which turn take if more than one possibility is legal",
     )
+    parser.add_argument(
+        "--tracer",
+        type=str,
+        required=False,
+        default="lookup",
+        choices=["lookup", "reference", "crack-edge"],
+        help="engine used to trace the paths of the bitmap",
+    )
+    parser.add_argument(
+        "--packed-bitmap",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="store bitmaps with 8 pixels per byte to reduce memory usage",
+    )
+    parser.add_argument(
+        "--despeckle",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="remove specks up to turdsize in bulk before tracing",
+    )
+    parser.add_argument(
+        "--tile-size",
+        type=int,
+        required=False,
+        default=None,
+        help="""trace bitmaps in tiles of this size with the crack-edge tracer to bound
+                        memory usage, majority and minority turnpolicy need --tracer crack-edge""",
+    )
+    parser.add_argument(
+        "--split-subtrees",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="write every outline with its holes as a separate SVG path",
+    )
+    parser.add_argument(
+        "--shape-cache",
+        type=int,
+        required=False,
+        default=0,
+        help="""memory cap in MB of the cache reusing curves of repeated shapes, 0 disables it,
+                        cached coordinates may differ from uncached ones by rounding""",
+    )
+    parser.add_argument(
+        "--levels",
+        type=int,
+        required=False,
+        default=8,
+        help="number of gray levels grayscale images are traced in",
+    )
+    parser.add_argument(
+        "--adaptive-levels",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="pick gray levels from the image histogram and merge identical layers",
+    )
+    parser.add_argument(
+        "--incremental-layers",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="trace only the regions of a gray level which changed since the previous one",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        required=False,
+        default=1,
+        help="number of processes converting gray levels or fitting curves in parallel",
+    )
     parser.add_argument(
         "--turdsize",
         type=int,
@@ -106,6 +196,16 @@ def main() -> None:
             args.longcurve,
             args.opttolerance,
             args.scale,
+            tracer_mapping[args.tracer],
+            args.packed_bitmap,
+            args.despeckle,
+            args.tile_size,
+            args.split_subtrees,
+            args.shape_cache * 2**20,
+            args.levels,
+            args.adaptive_levels,
+            args.incremental_layers,
+            args.jobs,
         )
         converter.run(output_path)
 
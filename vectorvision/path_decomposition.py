@@ -1,8 +1,15 @@
+import cv2
 import numpy as np
+from collections import namedtuple
 from enum import Enum
 from typing import Generator
 
 
+# bounds of the window (in pixels) searched at once by the path start scanner
+_SCAN_CHUNK_MIN = 64
+_SCAN_CHUNK_MAX = 1 << 20
+
+
 class Turnpolicy(Enum):
     BLACK = 0
     WHITE = 1
@@ -12,6 +19,627 @@ class Turnpolicy(Enum):
     MAJORITY = 5
 
 
+class Tracer(Enum):
+    REFERENCE = 0
+    LOOKUP_TABLE = 1
+    CRACK_EDGE = 2
+
+
+# (step_x, step_y) of the four tracing directions: up, right, down, left
+_DIRECTIONS = ((0, -1), (1, 0), (0, 1), (-1, 0))
+
+# marks a table entry which has to be resolved with the majority value
+_MAJORITY_TURN = -1
+
+
+def _build_turn_table(turnpolicy: Turnpolicy) -> tuple[int, ...]:
+    """Builds the direction lookup table used by the lookup table tracer.
+
+    The table is indexed with direction * 16 + code, where code is the 4-bit
+    encoding of the 2x2 neighbourhood of a path vertex (x, y): bit 0 is the
+    pixel (x - 1, y - 1), bit 1 is (x, y - 1), bit 2 is (x - 1, y) and bit 3
+    is (x, y). Entries hold the next direction and reproduce the decisions
+    made by Bitmap._find_path.
+
+    Args:
+        turnpolicy: the turnpolicy enum value
+
+    Returns:
+        Table of the next directions.
+    """
+    table = []
+    for direction, (step_x, step_y) in enumerate(_DIRECTIONS):
+        left_turn = (direction - 1) % 4  # (step_x, step_y) -> (step_y, -step_x)
+        right_turn = (direction + 1) % 4  # (step_x, step_y) -> (-step_y, step_x)
+        # offsets of the pixels given by _get_next_in_direction_points
+        left_x, left_y = (step_x + step_y - 1) // 2, (step_y - step_x - 1) // 2
+        right_x, right_y = (step_x - step_y - 1) // 2, (step_y + step_x - 1) // 2
+        left_bit = (left_y + 1) * 2 + left_x + 1
+        right_bit = (right_y + 1) * 2 + right_x + 1
+        for code in range(16):
+            left_color = code >> left_bit & 1
+            right_color = code >> right_bit & 1
+            if left_color and not right_color:
+                if turnpolicy == Turnpolicy.RIGHT:
+                    table.append(left_turn)
+                elif turnpolicy in (Turnpolicy.MAJORITY, Turnpolicy.MINORITY):
+                    table.append(_MAJORITY_TURN)
+                else:
+                    table.append(right_turn)
+            elif left_color:
+                table.append(left_turn)
+            elif not right_color:
+                table.append(right_turn)
+            else:
+                table.append(direction)
+    return tuple(table)
+
+
+_TURN_TABLES = {turnpolicy: _build_turn_table(turnpolicy) for turnpolicy in Turnpolicy}
+
+_DIRECTIONS_X = np.array([step_x for step_x, _ in _DIRECTIONS])
+_DIRECTIONS_Y = np.array([step_y for _, step_y in _DIRECTIONS])
+
+
+ChainCode = namedtuple("ChainCode", ["x", "y", "length", "steps"])
+
+# direction of a unit step, indexed with (step_x + 1) * 3 + step_y + 1
+_STEP_DIRECTIONS = np.array([-1, 3, -1, 0, -1, 2, -1, 1, -1], dtype=np.int8)
+
+
+class Path:
+    """Closed path of lattice points, stored in a single array.
+
+    Indexing and iterating a Path gives its points as array rows, and the
+    path converts to an array with np.asarray without copying, so the later
+    stages of the pipeline can read it as well as a list of (x, y) tuples.
+
+    Attributes:
+        points (np.ndarray): int32 array of shape (N, 2) with the x and y
+            coords of the points.
+        area (int): area enclosed by the path, positive when the path turns
+            around its inside counterclockwise on screen, like the traced paths.
+        sign (int): 1 for a nonnegative area and -1 otherwise.
+    """
+
+    __slots__ = ("points", "area", "sign")
+
+    def __init__(self, points, area: int = None):
+        self.points = np.asarray(points, dtype=np.int32).reshape(-1, 2)
+        if area is None:
+            # same sum as the one accumulated by Bitmap._find_path
+            x, y = self.points[:, 0].astype(np.int64), self.points[:, 1]
+            area = int(np.dot(np.roll(x, -1), np.roll(y, -1) - y))
+        self.area = area
+        self.sign = 1 if area >= 0 else -1
+
+    def __len__(self):
+        return len(self.points)
+
+    def __getitem__(self, item):
+        return self.points[item]
+
+    def __iter__(self):
+        return iter(self.points)
+
+    def __array__(self, dtype=None, copy=None):
+        dtype = self.points.dtype if dtype is None else np.dtype(dtype)
+        if copy is False and dtype != self.points.dtype:
+            raise ValueError("Path points can not be converted without a copy.")
+        if copy or dtype != self.points.dtype:
+            return self.points.astype(dtype, copy=True)
+        return self.points
+
+    def __eq__(self, other):
+        try:
+            return np.array_equal(self.points, np.asarray(other))
+        except ValueError:
+            return False
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Path({self.points.tolist()!r}, area={self.area})"
+
+    def to_chain_code(self) -> ChainCode:
+        """Encodes the path as its first point and 2 bits per step.
+
+        Returns:
+            ChainCode with the coords of the first point, the number of points
+            and the steps packed four to a byte, first step in the high bits.
+        """
+        steps = np.diff(self.points, axis=0, append=self.points[:1])
+        if (np.abs(steps).sum(axis=1) != 1).any():
+            raise ValueError("Path must be made of unit steps.")
+        codes = _STEP_DIRECTIONS[(steps[:, 0] + 1) * 3 + steps[:, 1] + 1]
+        codes = np.concatenate(
+            (codes.astype(np.uint8), np.zeros(-len(codes) % 4, dtype=np.uint8))
+        ).reshape(-1, 4)
+        packed = codes[:, 0] << 6 | codes[:, 1] << 4 | codes[:, 2] << 2 | codes[:, 3]
+        x, y = self.points[0].tolist() if len(self) else (0, 0)
+        return ChainCode(x, y, len(self), packed.tobytes())
+
+    @classmethod
+    def from_chain_code(cls, code: ChainCode):
+        """Path class constructor.
+
+        Args:
+            code: ChainCode given by Path.to_chain_code
+
+        Returns:
+            The object of type Path with the encoded points.
+        """
+        packed = np.frombuffer(code.steps, dtype=np.uint8)
+        codes = np.column_stack(
+            (packed >> 6, packed >> 4 & 3, packed >> 2 & 3, packed & 3)
+        ).reshape(-1)[: max(code.length - 1, 0)]
+        points = np.zeros((code.length, 2), dtype=np.int32)
+        if code.length:
+            points[0] = code.x, code.y
+            points[1:, 0] = _DIRECTIONS_X[codes]
+            points[1:, 1] = _DIRECTIONS_Y[codes]
+        return cls(np.cumsum(points, axis=0, dtype=np.int32))
+
+
+# pixels read by the majority value around a vertex at every side of it
+_MAJORITY_RADIUS = 4
+
+# number of vertex rows whose majority values are computed at once
+_MAJORITY_BAND_ROWS = 64
+
+# number of vertices up to which the stale windows of paths are merged
+_MAJORITY_STALE_AREA = 4096
+
+# number of lookups of stale majority values after which they are recomputed
+# at once, a block costs about as much as computing a dozen values one by one
+_MAJORITY_STALE_LOOKUPS = 8
+
+
+def _majority_values(signs: np.ndarray) -> np.ndarray:
+    """Computes the majority values of a block of vertices at once.
+
+    Replicates Bitmap._get_majority_value: for the radii 2 to 4 the colors on
+    the four sides of a square around the vertex are summed and the first
+    nonzero sum decides. Every side is a run of pixels along a row or a column,
+    so all the sums are differences of prefix sums along the rows and columns.
+
+    Args:
+        signs: colors of the pixels (1 black, -1 white, 0 outside the bitmap)
+            around the block, signs[r, c] is the pixel (x0 - 4 + c, y0 - 4 + r)
+            where (x0, y0) is the first vertex of the block
+
+    Returns:
+        Majority value of every vertex of the block, of shape
+        (signs.shape[0] - 7, signs.shape[1] - 7).
+    """
+    height = signs.shape[0] - 2 * _MAJORITY_RADIUS + 1
+    width = signs.shape[1] - 2 * _MAJORITY_RADIUS + 1
+    row_sums = np.zeros((signs.shape[0], signs.shape[1] + 1), dtype=np.int32)
+    np.cumsum(signs, axis=1, out=row_sums[:, 1:])
+    column_sums = np.zeros((signs.shape[0] + 1, signs.shape[1]), dtype=np.int32)
+    np.cumsum(signs, axis=0, out=column_sums[1:])
+
+    # the sign of the sum of radius i weighs 2 ** (4 - i), more than all the
+    # larger radii together, so the first nonzero sum decides
+    decision = np.zeros((height, width), dtype=np.int32)
+    for i in range(2, _MAJORITY_RADIUS + 1):
+        # the sides have 2 * i - 3 pixels, see range(-i + 1, i - 2)
+        length = 2 * i - 3
+        near, far = _MAJORITY_RADIUS - i, _MAJORITY_RADIUS + i
+        below = row_sums[far - 1 : far - 1 + height]  # (x + a, y + i - 1)
+        above = row_sums[near : near + height]  # (x + a - 1, y - i)
+        right = column_sums[:, far - 1 : far - 1 + width]  # (x + i - 1, y + a)
+        left = column_sums[:, near : near + width]  # (x - i, y + a)
+        start, end = near + 1, near + 1 + length
+        count = below[:, end : end + width] - below[:, start : start + width]
+        count += above[:, end - 1 : end - 1 + width]
+        count -= above[:, near : near + width]
+        count += right[end : end + height]
+        count -= right[start : start + height]
+        count += left[end : end + height]
+        count -= left[start : start + height]
+        np.sign(count, out=count)
+        count <<= _MAJORITY_RADIUS - i
+        decision += count
+    return decision > 0
+
+
+def _majority_block(
+    pixel_block, shape: tuple[int, int], x0: int, y0: int, x1: int, y1: int
+) -> np.ndarray:
+    """Computes the majority values of the vertices [x0, x1) x [y0, y1).
+
+    Args:
+        pixel_block: callable reading the pixels of rows [top, bottom) and
+            columns [left, right) of the bitmap, True for black
+        shape: height and width of the bitmap
+        x0: x-coord of the first vertex
+        y0: y-coord of the first vertex
+        x1: x-coord past the last vertex
+        y1: y-coord past the last vertex
+
+    Returns:
+        Majority values indexed by [y - y0, x - x0].
+    """
+    height, width = shape
+    top, left = y0 - _MAJORITY_RADIUS, x0 - _MAJORITY_RADIUS
+    signs = np.zeros(
+        (y1 - top + _MAJORITY_RADIUS - 1, x1 - left + _MAJORITY_RADIUS - 1),
+        dtype=np.int8,
+    )
+    rows = slice(max(top, 0), min(top + signs.shape[0], height))
+    columns = slice(max(left, 0), min(left + signs.shape[1], width))
+    if rows.start < rows.stop and columns.start < columns.stop:
+        pixels = pixel_block(rows.start, rows.stop, columns.start, columns.stop)
+        signs[
+            rows.start - top : rows.stop - top,
+            columns.start - left : columns.stop - left,
+        ] = np.where(pixels, np.int8(1), np.int8(-1))
+    return _majority_values(signs)
+
+
+def _pointer_jump_minimum(values: np.ndarray, successors: np.ndarray) -> np.ndarray:
+    """Computes the minimum of values over every cycle of a permutation.
+
+    Args:
+        values: value of every element
+        successors: permutation that links the elements into cycles
+
+    Returns:
+        Minimum value of the cycle of every element.
+    """
+    while True:
+        minimum = np.minimum(values, values[successors])
+        if np.array_equal(minimum, values):
+            return minimum
+        values = minimum
+        successors = successors[successors]
+
+
+def _pointer_jump_distance(successors: np.ndarray, is_last: np.ndarray) -> np.ndarray:
+    """Computes for every element the number of steps to the next marked element.
+
+    Args:
+        successors: permutation that links the elements into cycles
+        is_last: elements at which the walk stops, one in every cycle
+
+    Returns:
+        Number of steps from every element to the marked element of its cycle.
+    """
+    successors = np.where(is_last, np.arange(successors.size), successors)
+    distance = (~is_last).astype(np.int64)
+    while not is_last[successors].all():
+        distance = distance + distance[successors]
+        successors = successors[successors]
+    return distance
+
+
+def _pointer_jump_root(successors: np.ndarray) -> np.ndarray:
+    """Finds for every element the fixed point its successors lead to.
+
+    Args:
+        successors: links of a forest, roots link to themselves
+
+    Returns:
+        Root reached from every element.
+    """
+    while True:
+        jumped = successors[successors]
+        if np.array_equal(jumped, successors):
+            return successors
+        successors = jumped
+
+
+def _crack_edges(
+    padded: np.ndarray, turnpolicy: Turnpolicy, majority, margin: int = 0
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Finds all boundary edges between black and white pixels at once.
+
+    Edges run between neighbouring lattice points and are directed so that the
+    black pixel lies on their right, the way Bitmap._find_path follows an
+    outline. For every edge the direction taken at its end point is looked up
+    in the turn table of the turnpolicy.
+
+    Args:
+        padded: bitmap with a white border of at least one pixel; lattice point
+            (x, y) is the upper left corner of pixel padded[y + 1, x + 1]
+        turnpolicy: the turnpolicy enum value
+        majority: callable returning the majority values for arrays of x and y
+            coords of lattice points, used by the MAJORITY/MINORITY policies
+        margin: number of lattice points along every side of the bitmap whose
+            edges are left out, as they are not followed by a known edge
+
+    Returns:
+        x and y coords of the edge start points, edge directions and the
+        directions of the edges that follow them.
+    """
+    north_west = padded[:-1, :-1]
+    north_east = padded[:-1, 1:]
+    south_west = padded[1:, :-1]
+    south_east = padded[1:, 1:]
+
+    codes = north_west.view(np.uint8) | north_east.view(np.uint8) << 1
+    codes |= south_west.view(np.uint8) << 2
+    codes |= south_east.view(np.uint8) << 3
+
+    # the edge leaving a lattice point in every direction has black on its right
+    starts = [
+        np.nonzero(north_east & ~north_west),
+        np.nonzero(south_east & ~north_east),
+        np.nonzero(south_west & ~south_east),
+        np.nonzero(north_west & ~south_west),
+    ]
+    y = np.concatenate([ys for ys, _ in starts])
+    x = np.concatenate([xs for _, xs in starts])
+    direction = np.repeat(np.arange(4, dtype=np.int8), [ys.size for ys, _ in starts])
+    if margin:
+        inside = (
+            (x >= margin)
+            & (x < codes.shape[1] - margin)
+            & (y >= margin)
+            & (y < codes.shape[0] - margin)
+        )
+        x, y, direction = x[inside], y[inside], direction[inside]
+
+    end_x = x + _DIRECTIONS_X[direction]
+    end_y = y + _DIRECTIONS_Y[direction]
+    table = np.array(_TURN_TABLES[turnpolicy], dtype=np.int8)
+    next_direction = table[direction.astype(np.intp) << 4 | codes[end_y, end_x]]
+
+    ambiguous = np.flatnonzero(next_direction == _MAJORITY_TURN)
+    if ambiguous.size:
+        majority_turns_left = turnpolicy == Turnpolicy.MAJORITY
+        values = majority(end_x[ambiguous], end_y[ambiguous]).astype(bool)
+        next_direction[ambiguous] = np.where(
+            values == majority_turns_left,
+            (direction[ambiguous] - 1) % 4,
+            (direction[ambiguous] + 1) % 4,
+        )
+
+    return x, y, direction, next_direction
+
+
+def _find_cycles(
+    successors: np.ndarray,
+    x: np.ndarray,
+    y: np.ndarray,
+    direction: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Splits linked boundary edges into cycles and finds where each cycle starts.
+
+    Cycles with black on their left are holes, which Bitmap._find_path follows
+    in the opposite direction. A cycle starts with the upward edge (in the
+    direction it is followed) on the left of its first pixel in row-major order.
+
+    Args:
+        successors: index of the edge following every edge
+        x: x coords of the edge start points
+        y: y coords of the edge start points
+        direction: edge directions
+
+    Returns:
+        Cycle of every edge, area of every cycle (negative for holes), first edge
+        of every cycle and a mask of the edges that belong to holes.
+    """
+    cycles = _pointer_jump_minimum(np.arange(successors.size), successors)
+    cycles = np.unique(cycles, return_inverse=True)[1]
+    end_x = x + _DIRECTIONS_X[direction]
+    areas = np.bincount(cycles, weights=end_x * _DIRECTIONS_Y[direction])
+
+    in_hole = areas[cycles] < 0
+    upward = np.flatnonzero(np.where(in_hole, direction == 2, direction == 0))
+    start_y = np.where(in_hole[upward], y[upward] + 1, y[upward])
+    upward = upward[np.lexsort((x[upward], start_y, cycles[upward]))]
+    start_edges = upward[np.unique(cycles[upward], return_index=True)[1]]
+    return cycles, areas, start_edges, in_hole
+
+
+def _link_crack_edges(
+    x: np.ndarray,
+    y: np.ndarray,
+    direction: np.ndarray,
+    next_direction: np.ndarray,
+    width: int,
+    turdsize: int,
+    invert_holes: bool = True,
+) -> list[Path]:
+    """Links boundary edges into closed paths using index arrays.
+
+    Bitmap._find_path inverts the inside of every traced path, so an ambiguous
+    junction is resolved with inverted colors when it is first reached from a
+    hole, and a path always leaves its start point upwards whatever the
+    turnpolicy. Both rules are applied by swapping the edges that follow the
+    two edges entering a junction until the cycles agree with them. The paths
+    are then sorted by their first pixel, which gives the order of
+    Bitmap.generate_paths_list.
+
+    Args:
+        x: x coords of the edge start points
+        y: y coords of the edge start points
+        direction: edge directions
+        next_direction: directions taken at the edge end points when the
+            junction is reached from an outline
+        width: width of the bitmap
+        turdsize: minimal area of the paths that will be produced
+        invert_holes: whether junctions first reached from a hole use the
+            opposite connectivity
+
+    Returns:
+        List of paths.
+    """
+    if x.size == 0:
+        return []
+
+    stride = width + 1
+    direction = direction.astype(np.int64)
+    keys = (y * stride + x) * 4 + direction
+    order = np.argsort(keys)
+    keys, x, y, direction = keys[order], x[order], y[order], direction[order]
+    ends = (y + _DIRECTIONS_Y[direction]) * stride + x + _DIRECTIONS_X[direction]
+    successors = np.searchsorted(keys, ends * 4 + next_direction[order])
+
+    # junctions are entered by two edges
+    by_end = np.argsort(ends, kind="stable")
+    shared = ends[by_end[1:]] == ends[by_end[:-1]]
+    first_in = by_end[:-1][shared]
+    second_in = by_end[1:][shared]
+    junctions = ends[first_in]
+    outline_successors = successors[first_in]
+
+    while True:
+        cycles, areas, start_edges, in_hole = _find_cycles(successors, x, y, direction)
+        start_points = np.where(
+            in_hole[start_edges],
+            ends[start_edges],
+            y[start_edges] * stride + x[start_edges],
+        )
+        if not junctions.size:
+            break
+
+        first_cycles = cycles[first_in]
+        second_cycles = cycles[second_in]
+        first_visit = np.where(
+            start_points[first_cycles] <= start_points[second_cycles],
+            first_cycles,
+            second_cycles,
+        )
+        at_start = start_points[first_visit] == junctions
+        outline_wanted = ~(invert_holes & (areas[first_visit] < 0))
+        swap = np.where(
+            at_start,
+            first_cycles == second_cycles,
+            (successors[first_in] == outline_successors) != outline_wanted,
+        )
+        if not swap.any():
+            break
+        first_swapped, second_swapped = first_in[swap], second_in[swap]
+        successors[first_swapped], successors[second_swapped] = (
+            successors[second_swapped],
+            successors[first_swapped],
+        )
+
+    # holes are followed backwards, from the end of every edge to its start
+    predecessors = np.empty_like(successors)
+    predecessors[successors] = np.arange(successors.size)
+    successors = np.where(in_hole, predecessors, successors)
+    x = np.where(in_hole, x + _DIRECTIONS_X[direction], x)
+    y = np.where(in_hole, y + _DIRECTIONS_Y[direction], y)
+
+    is_start = np.zeros(successors.size, dtype=bool)
+    is_start[start_edges] = True
+    lengths = np.bincount(cycles)[cycles]
+    positions = (lengths - _pointer_jump_distance(successors, is_start)) % lengths
+    lengths = lengths[start_edges]
+
+    path_order = np.argsort(start_points, kind="stable")
+    kept = path_order[np.abs(areas[path_order]) > turdsize]
+    rank = np.full(areas.size, -1)
+    rank[kept] = np.arange(kept.size)
+
+    edges = np.flatnonzero(rank[cycles] >= 0)
+    edges = edges[np.lexsort((positions[edges], rank[cycles[edges]]))]
+    points = np.column_stack((x[edges], y[edges])).astype(np.int32)
+    bounds = np.cumsum(lengths[kept]).tolist()
+
+    # the paths are views into one array of points
+    paths_list = list()
+    start = 0
+    for end, area in zip(bounds, np.abs(areas[kept]).astype(np.int64).tolist()):
+        paths_list.append(Path(points[start:end], area))
+        start = end
+    return paths_list
+
+
+def _component_first_pixels(labels: np.ndarray, stats: np.ndarray) -> np.ndarray:
+    """Finds the first pixel, in row-major order, of every connected component.
+
+    Args:
+        labels: label image given by cv2.connectedComponentsWithStats
+        stats: component statistics given by cv2.connectedComponentsWithStats
+
+    Returns:
+        Flat index of the first pixel of every label.
+    """
+    rows = np.arange(labels.shape[0])[:, None]
+    # only the pixels on the top row of their component are candidates
+    candidates = np.flatnonzero(rows == stats[labels, cv2.CC_STAT_TOP])
+    _, first = np.unique(labels.reshape(-1)[candidates], return_index=True)
+    return candidates[first]
+
+
+def _remove_specks(padded: np.ndarray, turdsize: int) -> tuple[np.ndarray, int]:
+    """Removes all connected components too small to produce a path.
+
+    Black components are 8-connected and white ones 4-connected, so they nest
+    into a tree whose root is the white background. The parent of a component
+    holds the pixel left of its first pixel. The filled area of a component,
+    its own area plus the filled areas of its children, is the area of the
+    outline around it. A component whose filled area is at most turdsize is
+    painted over with the color of its parent, unless it is white and touches
+    another white component diagonally, which could change the way the paths
+    around it are traced.
+
+    Args:
+        padded: bitmap with a white border of at least one pixel
+        turdsize: area up to which components are removed
+
+    Returns:
+        The bitmap without the specks and the number of removed components.
+    """
+    if not padded.any():
+        return padded.copy(), 0
+
+    black = padded.view(np.uint8)
+    white = 1 - black
+    black_count, black_labels, black_stats, _ = cv2.connectedComponentsWithStats(
+        black, connectivity=8
+    )
+    white_count, white_labels, white_stats, _ = cv2.connectedComponentsWithStats(
+        white, connectivity=4
+    )
+    _, diagonal_labels, diagonal_stats, _ = cv2.connectedComponentsWithStats(
+        white, connectivity=8
+    )
+
+    # nodes of the tree: black labels 1.. followed by white labels 1..
+    offset = black_count - 1
+    nodes = np.where(padded, black_labels - 1, white_labels + offset - 1).reshape(-1)
+    first = np.concatenate(
+        (
+            _component_first_pixels(black_labels, black_stats)[1:],
+            _component_first_pixels(white_labels, white_stats)[1:],
+        )
+    )
+    is_black = np.arange(first.size) < offset
+    area = np.concatenate(
+        (black_stats[1:, cv2.CC_STAT_AREA], white_stats[1:, cv2.CC_STAT_AREA])
+    ).astype(np.int64)
+    root = nodes[0]
+    parent = nodes[np.maximum(first - 1, 0)]
+    is_root = np.arange(first.size) == root
+    parent[root] = root
+
+    depth = _pointer_jump_distance(parent, is_root)
+    levels = np.argsort(depth, kind="stable")
+    level_bounds = np.searchsorted(depth[levels], np.arange(depth.max() + 2))
+    filled = area.copy()
+    for level in range(depth.max(), 0, -1):
+        members = levels[level_bounds[level] : level_bounds[level + 1]]
+        np.add.at(filled, parent[members], filled[members])
+
+    diagonal_area = diagonal_stats[diagonal_labels.reshape(-1)[first], cv2.CC_STAT_AREA]
+    removed = (filled <= turdsize) & (is_black | (diagonal_area == area)) & ~is_root
+    for level in range(1, depth.max() + 1):
+        members = levels[level_bounds[level] : level_bounds[level + 1]]
+        removed[members] |= removed[parent[members]]
+    speck_count = int(np.count_nonzero(removed & ~removed[parent]))
+
+    # every removed component takes the color of its closest kept ancestor
+    kept_ancestor = _pointer_jump_root(np.where(removed, parent, np.arange(first.size)))
+    colors = is_black[kept_ancestor]
+    return colors[nodes].reshape(padded.shape), speck_count
+
+
 class Bitmap:
     """Represents one of the image bitmaps (color).
 
@@ -19,18 +647,27 @@ class Bitmap:
     and is used as the first stage in the potrace algorithm.
 
     Attributes:
-        bitmap (np.ndarray): array representing the bitmap.
+        bitmap (np.ndarray): array representing the bitmap, a view into a copy
+            padded with one white pixel on every side.
     """
 
     def __init__(self, array: np.ndarray):
-        if np.isin(array, [0, 1]).all():
-            self.bitmap = np.invert(array.astype("bool"))
+        if array.dtype == bool or np.isin(array, [0, 1]).all():
+            height, width = array.shape
+            self._padded = np.zeros((height + 2, width + 2), dtype=bool)
+            self.bitmap = self._padded[1:-1, 1:-1]
+            np.logical_not(array, out=self.bitmap)
         else:
             raise ValueError("Array must be binary.")
+        self._reset_majority()
 
     def __getitem__(self, point):
         return self.bitmap[point[0]][point[1]]
 
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.bitmap.shape
+
     @classmethod
     def from_pil_image(cls, image):
         """Bitmap class constructor.
@@ -46,23 +683,31 @@ class Bitmap:
     def _find_next_path_start(self) -> Generator[np.ndarray, None, None]:
         """Yields next vertex coords that is the begginning of the path.
 
+        The bitmap is scanned once in row-major order. Path colors are inverted
+        inside find_path only below and to the right of the path start, so the
+        scan resumes from the last yielded point instead of starting over.
+
         Returns:
             Starting point.
         """
+        # the white border of the padded copy keeps the row-major order
+        flat = self._padded.reshape(-1)
+        width = self._padded.shape[1]
+        cursor = 0
+        chunk = _SCAN_CHUNK_MIN
 
-        w = np.nonzero(self.bitmap)
-
-        while w[0].size != 0:
-            leftmost_point_row_map = np.where(w[1] == w[1][0])
-
-            leftmost_point_row_all_points = np.column_stack(
-                (w[0][leftmost_point_row_map], w[1][leftmost_point_row_map])
-            )
-            leftmost_top_point = leftmost_point_row_all_points[0]
-            yield leftmost_top_point
+        while cursor < flat.size:
+            window = flat[cursor : cursor + chunk]
+            offset = int(window.argmax())
+            if not window[offset]:
+                cursor += window.size
+                chunk = min(2 * chunk, _SCAN_CHUNK_MAX)
+                continue
 
-            # path colors are inverted on a bitmap inside find_path
-            w = np.nonzero(self.bitmap)
+            cursor += offset
+            chunk = _SCAN_CHUNK_MIN
+            row, column = divmod(cursor, width)
+            yield np.array([row - 1, column - 1])
 
     def _get_color_at_point(self, point: tuple[int, int]) -> int:
         """Get the color at a given point.
@@ -123,6 +768,9 @@ class Bitmap:
                 self._xor_to_ref(x, min(y, y1), xa)
                 y1 = y
 
+        if self._majority:
+            self._mark_majority_stale(points_in_path)
+
     def _get_color_in_bounds(self, x_, y_):
         """Get the color at a given point.
 
@@ -163,6 +811,170 @@ class Bitmap:
                 return 0
         return 0
 
+    def _pixel_block(self, top: int, bottom: int, left: int, right: int) -> np.ndarray:
+        """Reads the pixels of rows [top, bottom) and columns [left, right)."""
+        return self.bitmap[top:bottom, left:right]
+
+    def _majority_band(self, band: int) -> np.ndarray:
+        """Looks the majority values of a band of vertex rows up.
+
+        The values of a band are computed on first use, from the current bitmap,
+        and kept packed with 8 values per byte.
+
+        Args:
+            band: index of the band of _MAJORITY_BAND_ROWS vertex rows
+
+        Returns:
+            Packed majority values of the band indexed by [y - first row, x // 8].
+        """
+        values = self._majority.get(band)
+        if values is None:
+            height, width = self.shape
+            row = band * _MAJORITY_BAND_ROWS
+            block = _majority_block(
+                self._pixel_block,
+                (height, width),
+                0,
+                row,
+                width + 1,
+                min(row + _MAJORITY_BAND_ROWS, height + 1),
+            )
+            values = self._majority[band] = np.packbits(block, axis=1)
+        return values
+
+    def _majority_at(self, x: int, y: int) -> int:
+        """Looks the majority value of the vertex (x, y) up.
+
+        Gives the same value as _get_majority_value on the current bitmap. The
+        values made stale by inverted paths are computed one by one for the
+        first few lookups, and then recomputed a block at a time, see
+        _mark_majority_stale.
+
+        Args:
+            x: x-coord of a point
+            y: y-coord of a point
+
+        Returns:
+            Majority color value.
+        """
+        stale = self._majority_stale
+        if stale and stale[0] <= y < stale[1] and stale[2] <= x < stale[3]:
+            self._majority_stale_lookups -= 1
+            if self._majority_stale_lookups:
+                return self._get_majority_value(x, y)
+            self._majority_stale = None
+            self._refresh_majority(*stale)
+        cells = self._majority_stale_cells
+        if cells is not None and cells[y >> 3, x >> 6]:
+            cells[y >> 3, x >> 6] -= 1
+            if cells[y >> 3, x >> 6]:
+                return self._get_majority_value(x, y)
+            top, left = y & ~7, x & ~63
+            self._refresh_majority(top, top + 8, left, left + 64)
+        band, row = divmod(y, _MAJORITY_BAND_ROWS)
+        return int(self._majority_band(band)[row, x >> 3]) >> (7 - (x & 7)) & 1
+
+    def _majority_lookup(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """Looks the majority values of arrays of vertices up.
+
+        Args:
+            xs: x-coords of the points
+            ys: y-coords of the points
+
+        Returns:
+            Majority color values of the points.
+        """
+        if self._majority_stale or self._majority_stale_cells is not None:
+            self._reset_majority()
+        values = np.zeros(len(xs), dtype=np.uint8)
+        bands, rows = np.divmod(ys, _MAJORITY_BAND_ROWS)
+        for band in np.unique(bands).tolist():
+            selected = bands == band
+            x = xs[selected]
+            packed = self._majority_band(band)[rows[selected], x >> 3]
+            values[selected] = packed >> (7 - (x & 7)) & 1
+        return values
+
+    def _reset_majority(self) -> None:
+        """Drops all the majority values, to be computed again on first use."""
+        self._majority = dict()
+        self._majority_stale = None
+        self._majority_stale_lookups = 0
+        self._majority_stale_cells = None
+
+    def _mark_majority_stale(self, points_in_path: list[tuple[int, int]]) -> None:
+        """Marks the majority values depending on the inside of a path as stale.
+
+        The stale windows of consecutive paths are merged into one rectangle as
+        long as it stays small or mostly covered by them. Otherwise the window
+        replaces it, and the rectangle is marked in a coarse grid of cells of
+        8 x 64 vertices. The rectangle and every cell are recomputed at once on
+        the _MAJORITY_STALE_LOOKUPS-th lookup of a value inside of them.
+
+        Args:
+            points_in_path: list of points in path
+        """
+        xs, ys = zip(*points_in_path)
+        height, width = self.shape
+        # the pixels [x - 4, x + 3] x [y - 4, y + 3] decide the vertex (x, y)
+        top = max(min(ys) - _MAJORITY_RADIUS + 1, 0)
+        bottom = min(max(ys) + _MAJORITY_RADIUS, height + 1)
+        left = max(min(xs) - _MAJORITY_RADIUS + 1, 0)
+        right = min(max(xs) + _MAJORITY_RADIUS, width + 1)
+        stale = self._majority_stale
+        lookups = _MAJORITY_STALE_LOOKUPS
+        if stale:
+            stale_top, stale_bottom, stale_left, stale_right = stale
+            merged_top, merged_bottom = min(top, stale_top), max(bottom, stale_bottom)
+            merged_left, merged_right = min(left, stale_left), max(right, stale_right)
+            area = (bottom - top) * (right - left)
+            stale_area = (stale_bottom - stale_top) * (stale_right - stale_left)
+            merged_area = (merged_bottom - merged_top) * (merged_right - merged_left)
+            if merged_area <= max(_MAJORITY_STALE_AREA, area + stale_area):
+                top, bottom = merged_top, merged_bottom
+                left, right = merged_left, merged_right
+                lookups = self._majority_stale_lookups
+            else:
+                if self._majority_stale_cells is None:
+                    self._majority_stale_cells = np.zeros(
+                        ((height + 8) >> 3, (width + 64) >> 6), dtype=np.uint8
+                    )
+                self._majority_stale_cells[
+                    stale_top >> 3 : ((stale_bottom - 1) >> 3) + 1,
+                    stale_left >> 6 : ((stale_right - 1) >> 6) + 1,
+                ] = _MAJORITY_STALE_LOOKUPS
+        self._majority_stale = (top, bottom, left, right)
+        self._majority_stale_lookups = lookups
+
+    def _refresh_majority(self, top: int, bottom: int, left: int, right: int) -> None:
+        """Recomputes the majority values of the vertices [left, right) x [top, bottom)
+        in the bands computed so far.
+
+        Args:
+            top: y-coord of the first vertex
+            bottom: y-coord past the last vertex
+            left: x-coord of the first vertex
+            right: x-coord past the last vertex
+        """
+        height, width = self.shape
+        # whole bytes of the packed bands
+        left, right = left & ~7, min((right + 7) & ~7, width + 1)
+        bottom = min(bottom, height + 1)
+        first_band = top // _MAJORITY_BAND_ROWS
+        last_band = (bottom - 1) // _MAJORITY_BAND_ROWS
+        for band in range(first_band, last_band + 1):
+            values = self._majority.get(band)
+            if values is None:
+                continue
+            row = band * _MAJORITY_BAND_ROWS
+            y0, y1 = max(top, row), min(bottom, row + _MAJORITY_BAND_ROWS)
+            block = _majority_block(
+                self._pixel_block, (height, width), left, y0, right, y1
+            )
+            packed = np.packbits(block, axis=1)
+            first = left >> 3
+            values[y0 - row : y1 - row, first : first + packed.shape[1]] = packed
+
     def _find_path(
         self,
         x_start: int,
@@ -207,13 +1019,10 @@ class Bitmap:
             if left_color and not right_color:
                 if (
                     turnpolicy == Turnpolicy.RIGHT
-                    or (
-                        turnpolicy == Turnpolicy.MAJORITY
-                        and self._get_majority_value(x, y)
-                    )
+                    or (turnpolicy == Turnpolicy.MAJORITY and self._majority_at(x, y))
                     or (
                         turnpolicy == Turnpolicy.MINORITY
-                        and not self._get_majority_value(x, y)
+                        and not self._majority_at(x, y)
                     )
                 ):
                     step_x, step_y = step_y, -step_x  # right turn
@@ -232,23 +1041,578 @@ class Bitmap:
         if area > turdsize:
             yield points_in_path
 
+    def _neighbourhood_reader(self):
+        """Creates a function reading the 2x2 neighbourhood of a vertex.
+
+        Returns:
+            Function of the vertex coords (x, y) returning the 4-bit code of the
+            pixels (x - 1, y - 1), (x, y - 1), (x - 1, y) and (x, y).
+        """
+        pixels = memoryview(self._padded).cast("B")
+        stride = self._padded.shape[1]
+
+        def read_neighbourhood(x: int, y: int) -> int:
+            position = y * stride + x
+            return (
+                pixels[position]
+                | pixels[position + 1] << 1
+                | pixels[position + stride] << 2
+                | pixels[position + stride + 1] << 3
+            )
+
+        return read_neighbourhood
+
+    def _find_path_lookup(
+        self,
+        x_start: int,
+        y_start: int,
+        turdsize: int,
+        turnpolicy: Turnpolicy = Turnpolicy.RIGHT,
+    ):
+        """Compute a path in the given pixmap, separating black from white.
+            Produces the same paths as _find_path, but reads the 2x2 neighbourhood
+            of every vertex from the padded bitmap as a 4-bit code and looks the
+            next direction up in a table precomputed for the turnpolicy.
+
+        Args:
+            x_start: x coord of the starting point
+            y_start: y coord of the starting point
+            turdsize: minimal size of the path that will be produced
+            turnpolicy: the turnpolicy enum value
+        """
+        table = _TURN_TABLES[turnpolicy]
+        majority_turns_left = turnpolicy == Turnpolicy.MAJORITY
+        read_neighbourhood = self._neighbourhood_reader()
+
+        x = x_start
+        y = y_start
+        direction = 0
+        points_in_path = []
+        area = 0
+
+        while True:
+            points_in_path.append((x, y))
+
+            step_x, step_y = _DIRECTIONS[direction]
+            x += step_x
+            y += step_y
+            area += x * step_y
+
+            if x == x_start and y == y_start:
+                break  # end the loop if path is completed
+
+            next_direction = table[direction << 4 | read_neighbourhood(x, y)]
+            if next_direction == _MAJORITY_TURN:
+                if bool(self._majority_at(x, y)) == majority_turns_left:
+                    next_direction = (direction - 1) % 4
+                else:
+                    next_direction = (direction + 1) % 4
+            direction = next_direction
+
+        self._invert_color_inside_path(points_in_path)
+
+        if area > turdsize:
+            yield points_in_path
+
+    def _find_paths_crack_edge(
+        self, turdsize: int, turnpolicy: Turnpolicy = Turnpolicy.RIGHT
+    ) -> list[Path]:
+        """Compute all paths of the bitmap at once from its black/white boundary edges.
+            Unlike _find_path the bitmap is left unchanged. The paths are the same
+            as those of the other tracers, except for MAJORITY and MINORITY where
+            majority values are taken from the original bitmap instead of the one
+            inverted by the paths traced so far.
+
+        Args:
+            turdsize: minimal area of the paths that will be produced
+            turnpolicy: the turnpolicy enum value
+
+        Returns:
+            List of paths.
+        """
+
+        edges = _crack_edges(self._padded, turnpolicy, self._majority_lookup)
+        invert_holes = turnpolicy not in (Turnpolicy.MAJORITY, Turnpolicy.MINORITY)
+        return _link_crack_edges(*edges, self.shape[1], turdsize, invert_holes)
+
+    def _set_padded(self, padded: np.ndarray) -> None:
+        """Replaces the pixels with those of a padded bitmap of the same shape."""
+        self._padded[...] = padded
+
+    def remove_specks(self, turdsize: int = 2) -> int:
+        """Removes all the specks too small to produce a path, before tracing.
+
+        Connected components whose outline encloses an area of at most turdsize
+        are found at once and painted over with the color around them. Tracing
+        with the same turdsize then gives the same paths as without this step,
+        except that MAJORITY and MINORITY may turn differently next to a
+        removed speck.
+
+        Args:
+            turdsize: area up to which components are removed
+
+        Returns:
+            Number of removed specks.
+        """
+        padded, speck_count = _remove_specks(self._padded, turdsize)
+        self._set_padded(padded)
+        self._reset_majority()
+        return speck_count
+
     def generate_paths_list(
-        self, turdsize: int = 2, turnpolicy=Turnpolicy.RIGHT
-    ) -> list[list[tuple[int, int]]]:
+        self,
+        turdsize: int = 2,
+        turnpolicy=Turnpolicy.RIGHT,
+        tracer: Tracer = Tracer.REFERENCE,
+    ) -> list[Path]:
         """Generate a list of paths from the bitmap.
 
         Args:
             turdsize: minimal area of the paths that will be produced
             turnpolicy: the turnpolicy enum value
+            tracer: the tracing engine used to follow the paths
 
         Returns:
             List of paths.
         """
+        if tracer == Tracer.CRACK_EDGE:
+            return self._find_paths_crack_edge(turdsize, turnpolicy)
+        if tracer == Tracer.LOOKUP_TABLE:
+            find_path = self._find_path_lookup
+        else:
+            find_path = self._find_path
+
         paths_list = list()
         for start_point in self._find_next_path_start():
-            for path in self._find_path(
-                start_point[1], start_point[0] + 1, turdsize, turnpolicy
+            for path in find_path(
+                int(start_point[1]), int(start_point[0]) + 1, turdsize, turnpolicy
             ):
-                paths_list.append(path)
+                paths_list.append(Path(path))
 
         return paths_list
+
+
+# index of the most significant set bit of a byte, counted from the left
+_FIRST_BIT = np.array([8 - byte.bit_length() for byte in range(256)])
+
+# number of bitmap rows converted at once when packing or unpacking
+_PACK_CHUNK_ROWS = 1024
+
+
+class PackedBitmap(Bitmap):
+    """Bitmap storing 8 pixels per byte.
+
+    Pixels are kept in the padded layout of Bitmap, with every row packed with
+    np.packbits, so a bitmap takes an eighth of the memory of Bitmap. Reading
+    the bitmap attribute unpacks a copy of it.
+
+    Attributes:
+        packed (np.ndarray): packed rows of the padded bitmap.
+    """
+
+    def __init__(self, array: np.ndarray):
+        height, width = array.shape
+        self._width = width
+        self.packed = np.zeros((height + 2, (width + 9) // 8), dtype=np.uint8)
+
+        for row in range(0, height, _PACK_CHUNK_ROWS):
+            chunk = np.asarray(array[row : row + _PACK_CHUNK_ROWS])
+            if chunk.dtype != bool and not ((chunk == 0) | (chunk == 1)).all():
+                raise ValueError("Array must be binary.")
+            padded = np.zeros((chunk.shape[0], width + 2), dtype=bool)
+            np.logical_not(chunk, out=padded[:, 1:-1])
+            self.packed[row + 1 : row + 1 + chunk.shape[0]] = np.packbits(
+                padded, axis=1
+            )
+
+        self._pixels = memoryview(self.packed).cast("B")
+        self._reset_majority()
+
+    @classmethod
+    def from_pil_image(cls, image):
+        """PackedBitmap class constructor.
+
+        Bilevel images are packed from their own 1 bit per pixel data without
+        ever being expanded to one byte per pixel.
+
+        Args:
+            image: PIL Image object
+
+        Returns:
+            The object of type PackedBitmap, created from PIL Image.
+        """
+        if image.mode != "1":
+            return cls(np.array(image))
+
+        bitmap = cls(np.zeros((0, image.width), dtype=bool))
+        row_bytes = (image.width + 7) // 8
+        rows = np.frombuffer(image.tobytes(), dtype=np.uint8)
+        rows = np.invert(rows.reshape(image.height, row_bytes))
+        if image.width % 8:
+            rows[:, -1] &= 0xFF << (8 - image.width % 8) & 0xFF
+
+        # shift every row one pixel right to make room for the white border
+        shifted = np.zeros((image.height + 2, bitmap.packed.shape[1]), dtype=np.uint8)
+        shifted[1:-1, :row_bytes] = rows >> 1
+        carried = shifted[1:-1, 1 : row_bytes + 1]
+        carried |= rows[:, : carried.shape[1]] << 7
+        bitmap.packed = shifted
+        bitmap._pixels = memoryview(bitmap.packed).cast("B")
+        return bitmap
+
+    @property
+    def bitmap(self) -> np.ndarray:
+        return self._padded[1:-1, 1:-1]
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.packed.shape[0] - 2, self._width
+
+    @property
+    def _padded(self) -> np.ndarray:
+        rows = [
+            np.unpackbits(
+                self.packed[row : row + _PACK_CHUNK_ROWS], axis=1, count=self._width + 2
+            ).view(bool)
+            for row in range(0, self.packed.shape[0], _PACK_CHUNK_ROWS)
+        ]
+        return np.concatenate(rows)
+
+    def _set_padded(self, padded: np.ndarray) -> None:
+        """Replaces the pixels with those of a padded bitmap of the same shape."""
+        self.packed[...] = np.packbits(padded, axis=1)
+
+    def _get_pixel(self, x: int, y: int) -> int:
+        """Reads a pixel of the padded bitmap.
+
+        Args:
+            x: column of the pixel in the padded bitmap
+            y: row of the pixel in the padded bitmap
+
+        Returns:
+            1 for black and 0 for white.
+        """
+        return self._pixels[y * self.packed.shape[1] + (x >> 3)] >> (7 - (x & 7)) & 1
+
+    def __getitem__(self, point):
+        return bool(self._get_pixel(point[1] + 1, point[0] + 1))
+
+    def _find_next_path_start(self) -> Generator[np.ndarray, None, None]:
+        """Yields next vertex coords that is the begginning of the path.
+
+        Works like Bitmap._find_next_path_start, but skips over whole bytes of
+        white pixels.
+
+        Returns:
+            Starting point.
+        """
+        flat = self.packed.reshape(-1)
+        row_bytes = self.packed.shape[1]
+        cursor = 0
+        chunk = _SCAN_CHUNK_MIN
+
+        while cursor < flat.size:
+            window = flat[cursor : cursor + chunk] != 0
+            offset = int(window.argmax())
+            if not window[offset]:
+                cursor += window.size
+                chunk = min(2 * chunk, _SCAN_CHUNK_MAX)
+                continue
+
+            cursor += offset
+            chunk = _SCAN_CHUNK_MIN
+            row, byte = divmod(cursor, row_bytes)
+            column = byte * 8 + int(_FIRST_BIT[flat[cursor]])
+            yield np.array([row - 1, column - 1])
+
+    def _get_color_at_point(self, point: tuple[int, int]) -> int:
+        """Get the color at a given point.
+
+        Args:
+            point: point in the bitmap
+
+        Returns:
+            Value of the color at the specified point. Returns 0 (white) if point is out of range (by convention).
+        """
+        if 0 <= point[0] < self._width and 0 <= point[1] < self.packed.shape[0] - 2:
+            return self._get_pixel(point[0] + 1, point[1] + 1)
+        return 0
+
+    def _get_color_in_bounds(self, x_, y_):
+        """Get the color at a given point.
+
+        Args:
+            point: point in the bitmap
+
+        Returns:
+            Value of the color at the specified point. Returns 0 if point is out of range. -1
+            when white and 1 otherwise.
+        """
+        if 0 <= x_ < self._width and 0 <= y_ < self.packed.shape[0] - 2:
+            return 1 if self._get_pixel(x_ + 1, y_ + 1) else -1
+        return 0
+
+    def _pixel_block(self, top: int, bottom: int, left: int, right: int) -> np.ndarray:
+        """Reads the pixels of rows [top, bottom) and columns [left, right)."""
+        first = (left + 1) >> 3
+        rows = np.unpackbits(
+            self.packed[top + 1 : bottom + 1, first : (right + 8) >> 3],
+            axis=1,
+            count=right + 1 - first * 8,
+        )
+        return rows[:, left + 1 - first * 8 :].view(bool)
+
+    def _xor_to_ref(self, x: int, y: int, xa: int) -> None:
+        """Efficiently inverts the rectangle [x, xa] x [y, y1]"""
+        if x == xa:
+            return
+        start, stop = min(x, xa) + 1, max(x, xa) + 1
+        row = self.packed[y + 1]
+        first, last = start >> 3, (stop - 1) >> 3
+        head = 0xFF >> (start & 7)
+        tail = 0xFF << (7 - ((stop - 1) & 7)) & 0xFF
+        if first == last:
+            row[first] ^= head & tail
+        else:
+            row[first] ^= head
+            row[first + 1 : last] ^= 0xFF
+            row[last] ^= tail
+
+    def _neighbourhood_reader(self):
+        """Creates a function reading the 2x2 neighbourhood of a vertex.
+
+        Returns:
+            Function of the vertex coords (x, y) returning the 4-bit code of the
+            pixels (x - 1, y - 1), (x, y - 1), (x - 1, y) and (x, y).
+        """
+        pixels = self._pixels
+        row_bytes = self.packed.shape[1]
+
+        def read_neighbourhood(x: int, y: int) -> int:
+            # pixels x and x + 1 of the padded rows y and y + 1
+            position = y * row_bytes + (x >> 3)
+            shift = 6 - (x & 7)
+            if shift >= 0:
+                upper = pixels[position] >> shift & 3
+                lower = pixels[position + row_bytes] >> shift & 3
+            else:
+                upper = (pixels[position] << 1 | pixels[position + 1] >> 7) & 3
+                lower = (
+                    pixels[position + row_bytes] << 1
+                    | pixels[position + row_bytes + 1] >> 7
+                ) & 3
+            return _SWAPPED_PAIRS[upper] | _SWAPPED_PAIRS[lower] << 2
+
+        return read_neighbourhood
+
+
+# bit pair (left pixel in the high bit) reordered with the left pixel in bit 0
+_SWAPPED_PAIRS = (0, 2, 1, 3)
+
+# size of the square tiles of lattice points traced at once by TiledBitmap
+_TILE_SIZE = 1024
+
+
+class TiledBitmap:
+    """Bitmap traced one tile at a time.
+
+    Only one tile of the source array, with a few pixels around it, is read at
+    once, so the array can be e.g. a np.memmap of a raster that does not fit in
+    memory. The boundary edges found in the tiles are stitched into closed
+    paths afterwards, which gives the same paths as Bitmap.generate_paths_list
+    with Tracer.CRACK_EDGE.
+
+    Attributes:
+        array (np.ndarray): source array, 0 for black and 1 for white.
+        tile_size (int): size of the square tiles of lattice points.
+    """
+
+    def __init__(self, array: np.ndarray, tile_size: int = _TILE_SIZE):
+        if tile_size < 1:
+            raise ValueError("Tile size must be positive.")
+        self.array = array
+        self.tile_size = tile_size
+
+    @classmethod
+    def from_pil_image(cls, image, tile_size: int = _TILE_SIZE):
+        """TiledBitmap class constructor.
+
+        Args:
+            image: PIL Image object
+            tile_size: size of the square tiles of lattice points
+
+        Returns:
+            The object of type TiledBitmap, created from PIL Image.
+        """
+        return cls(np.array(image), tile_size)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.array.shape
+
+    def _pixel_block(self, top: int, bottom: int, left: int, right: int) -> np.ndarray:
+        """Reads the pixels of rows [top, bottom) and columns [left, right)."""
+        block = np.asarray(self.array[top:bottom, left:right])
+        if block.dtype != bool and not np.isin(block, [0, 1]).all():
+            raise ValueError("Array must be binary.")
+        return np.logical_not(block)
+
+    def _tile_edges(
+        self, x0: int, y0: int, x1: int, y1: int, turnpolicy: Turnpolicy
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Finds the boundary edges leaving the lattice points [x0, x1) x [y0, y1).
+
+        Args:
+            x0: x-coord of the first lattice point of the tile
+            y0: y-coord of the first lattice point of the tile
+            x1: x-coord past the last lattice point of the tile
+            y1: y-coord past the last lattice point of the tile
+            turnpolicy: the turnpolicy enum value
+
+        Returns:
+            x and y coords of the edge start points, edge directions and the
+            directions of the edges that follow them.
+        """
+        height, width = self.shape
+        # the edges of the tile end at most one lattice point outside of it
+        top, left = y0 - 2, x0 - 2
+        padded = np.zeros((y1 - top + 1, x1 - left + 1), dtype=bool)
+        rows = slice(max(top, 0), min(y1 + 1, height))
+        columns = slice(max(left, 0), min(x1 + 1, width))
+        if rows.start < rows.stop and columns.start < columns.stop:
+            padded[
+                rows.start - top : rows.stop - top,
+                columns.start - left : columns.stop - left,
+            ] = self._pixel_block(rows.start, rows.stop, columns.start, columns.stop)
+
+        def majority(xs, ys):
+            values = _majority_block(
+                self._pixel_block, self.shape, x0 - 1, y0 - 1, x1 + 1, y1 + 1
+            )
+            return values[ys, xs]
+
+        x, y, direction, next_direction = _crack_edges(
+            padded, turnpolicy, majority, margin=1
+        )
+        return x + (x0 - 1), y + (y0 - 1), direction, next_direction
+
+    def generate_paths_list(
+        self, turdsize: int = 2, turnpolicy=Turnpolicy.RIGHT
+    ) -> list[Path]:
+        """Generate a list of paths from the bitmap, tile by tile.
+
+        Args:
+            turdsize: minimal area of the paths that will be produced
+            turnpolicy: the turnpolicy enum value
+
+        Returns:
+            List of paths.
+        """
+        height, width = self.shape
+        edges = ([], [], [], [])
+        for y0 in range(0, height + 1, self.tile_size):
+            for x0 in range(0, width + 1, self.tile_size):
+                x1 = min(x0 + self.tile_size, width + 1)
+                y1 = min(y0 + self.tile_size, height + 1)
+                x, y, direction, next_direction = self._tile_edges(
+                    x0, y0, x1, y1, turnpolicy
+                )
+                edges[0].append(x.astype(np.int32))
+                edges[1].append(y.astype(np.int32))
+                edges[2].append(direction)
+                edges[3].append(next_direction)
+
+        x, y = (np.concatenate(parts).astype(np.int64) for parts in edges[:2])
+        direction, next_direction = (np.concatenate(parts) for parts in edges[2:])
+        invert_holes = turnpolicy not in (Turnpolicy.MAJORITY, Turnpolicy.MINORITY)
+        return _link_crack_edges(
+            x, y, direction, next_direction, width, turdsize, invert_holes
+        )
+
+
+PathTree = namedtuple("PathTree", ["parents", "depths"])
+
+
+def build_path_tree(paths: list[Path]) -> PathTree:
+    """Finds which paths are holes of which outlines.
+
+    Every traced path starts with an upward edge along the left side of its
+    first pixel and has its inside on the right of its upward edges. So the
+    closest vertical edge of another path left of that pixel either goes up,
+    and its path encloses the pixel, or goes down, and its path is a sibling
+    with the same parent. Paths must be in the order given by
+    generate_paths_list, where every path comes after the paths around it.
+
+    Args:
+        paths: list of paths given by generate_paths_list
+
+    Returns:
+        PathTree with the index of the path directly around every path, -1 for
+        top-level outlines, and the number of paths around every path, odd
+        for holes.
+    """
+    if not paths:
+        return PathTree([], [])
+
+    points = [np.asarray(path) for path in paths]
+    lengths = np.array([len(path_points) for path_points in points])
+    points = np.concatenate(points).astype(np.int64)
+    path_ids = np.repeat(np.arange(len(paths)), lengths)
+    first = np.cumsum(lengths) - lengths
+    # the point following every point of its path
+    following = np.arange(len(points)) + 1
+    following[first + lengths - 1] = first
+    x, y = points[:, 0], points[:, 1]
+    step_y = y[following] - y
+    vertical = np.flatnonzero(step_y != 0)
+
+    stride = x.max() - min(x.min(), 0) + 2
+    origin = min(x.min(), 0) - 1
+    edge_keys = np.minimum(y, y[following])[vertical] * stride + x[vertical] - origin
+    order = np.argsort(edge_keys, kind="stable")
+    edge_keys = edge_keys[order]
+    edge_ids = path_ids[vertical][order]
+    edge_up = step_y[vertical][order] < 0
+
+    # closest edge left of the first pixel, on the same row
+    start_rows = y[first] - 1
+    start_keys = start_rows * stride + x[first] - origin
+    closest = np.searchsorted(edge_keys, start_keys) - 1
+    found = closest >= 0
+    found[found] = edge_keys[closest[found]] // stride == start_rows[found]
+    neighbours = np.where(found, edge_ids[closest], -1)
+    encloses = found & edge_up[closest]
+
+    # siblings pass on to their own neighbour until an enclosing path is found
+    indices = np.arange(len(paths))
+    successors = np.where(found & ~encloses, neighbours, indices)
+    last = _pointer_jump_root(successors)
+    parents = np.where(encloses[last], neighbours[last], -1)
+    is_top_level = parents < 0
+    depths = _pointer_jump_distance(
+        np.where(is_top_level, indices, parents), is_top_level
+    )
+    return PathTree(parents.tolist(), depths.tolist())
+
+
+def get_subtrees(tree: PathTree) -> list[list[int]]:
+    """Groups every top-level outline with all the paths inside of it.
+
+    Args:
+        tree: PathTree given by build_path_tree
+
+    Returns:
+        Lists of path indices, one for every top-level outline in the order of
+        the paths, each holding the outline and then the paths inside of it in
+        the order of the paths.
+    """
+    subtrees = list()
+    roots = list()
+    for index, parent in enumerate(tree.parents):
+        if parent < 0:
+            roots.append(len(subtrees))
+            subtrees.append([index])
+        else:
+            roots.append(roots[parent])
+            subtrees[roots[index]].append(index)
+    return subtrees
@@ -8,28 +8,25 @@ Sums = namedtuple(
 )
 
 
-def calc_sums(path: list) -> namedtuple:
+def calc_sums(path: list) -> np.ndarray:
     """
     Calculate cumulative sums for the given path.
 
     Args:
-        path (list): A list of tuples, where each tuple represents a point (x, y).
+        path (list): A list of tuples, where each tuple represents a point (x, y), or a Path.
 
     Returns:
-        sums (Sums): A list of `Sums` namedtuples, each containing cumulative sums of x, y, xy, x^2, and y^2 coordinates.
+        sums (np.ndarray): Array of shape (len(path) + 1, 5), where row i holds the sums of x, y, xy, x^2 and y^2
+            over the first i points, relative to the first point, in the order of the `Sums` fields.
     """
 
-    a = np.array([(0, 0)] + path)
-    a[1:, :] -= np.array(path[0])
-    css = np.cumsum(a, axis=0)
-    cs2 = np.cumsum(np.power(a, 2), axis=0)
-    csm = np.cumsum(a[:, 0] * a[:, 1])
+    points = np.asarray(path)
+    a = points.astype(np.result_type(points, np.int64))
+    a -= a[0].copy()
+    x, y = a[:, 0], a[:, 1]
 
-    sums = []
-    for i in range(len(path) + 1):
-        x, y = css[i]
-        x2, y2 = cs2[i]
-        sums.append(Sums(x, y, csm[i], x2, y2))
+    sums = np.zeros((len(a) + 1, len(Sums._fields)), dtype=a.dtype)
+    np.cumsum(np.column_stack((x, y, x * y, x * x, y * y)), axis=0, out=sums[1:])
     return sums
 
 
@@ -131,6 +128,13 @@ def vector_is_not_between(
     )
 
 
+def _sign(value: int) -> int:
+    """
+    Return the sign of an integer as -1, 0 or 1.
+    """
+    return (value > 0) - (value < 0)
+
+
 def get_pivot_points(path: list, next_corner: list, path_len: int) -> list:
     """
     Calculate the pivot points for each point in the path.
@@ -146,88 +150,77 @@ def get_pivot_points(path: list, next_corner: list, path_len: int) -> list:
     Returns:
         list: A list of indexes of pivot points for each point of the path.
     """
+    # The constraint updates are done on plain Python integers, calling into NumPy
+    # for every scalar cross product and sign costs more than the arithmetic itself
+    points = np.asarray(path).tolist()
+
     # Counter of the occured directions in a format: [W, S, N, E]
     direction_counter = [0, 0, 0, 0]
     pivot_points = [None] * path_len
 
     for i in range(path_len - 1, -1, -1):
+        start_x, start_y = points[i]
 
         direction_counter[:] = [0, 0, 0, 0]
-        direction = compute_direction(path[i], path[(i + 1) % path_len])
+        next_x, next_y = points[(i + 1) % path_len]
+        direction = (3 + 3 * _sign(next_x - start_x) + _sign(next_y - start_y)) // 2
         direction_counter[direction] += 1
 
-        right_constraint = [0, 0]
-        left_constraint = [0, 0]
+        right_x, right_y = 0, 0
+        left_x, left_y = 0, 0
 
         next_corner_index = next_corner[i]
         last_corner_index = i
 
-        subpath_vector = compute_vector(path[i], path[next_corner_index])
-        direction = compute_direction(path[last_corner_index], path[next_corner_index])
+        next_x, next_y = points[next_corner_index]
+        vector_x = next_x - start_x
+        vector_y = next_y - start_y
+        direction = (3 + 3 * _sign(vector_x) + _sign(vector_y)) // 2
         direction_counter[direction] += 1
 
         # find the last corner that is laying on the straight subpath
         # next_corner_index is the first corner that violates the constraints
         while not (
             all(direction_counter)
-            or vector_is_not_between(subpath_vector, right_constraint, left_constraint)
+            or right_x * vector_y - right_y * vector_x < 0
+            or left_x * vector_y - left_y * vector_x > 0
         ):
 
-            if abs(subpath_vector[0]) > 1 or abs(subpath_vector[1]) > 1:
-                off_x = subpath_vector[0] + (
-                    1
-                    if (
-                        subpath_vector[1] >= 0
-                        and (subpath_vector[1] > 0 or subpath_vector[0] < 0)
-                    )
-                    else -1
+            if abs(vector_x) > 1 or abs(vector_y) > 1:
+                off_x = vector_x + (
+                    1 if (vector_y >= 0 and (vector_y > 0 or vector_x < 0)) else -1
                 )
-                off_y = subpath_vector[1] + (
-                    1
-                    if (
-                        subpath_vector[0] <= 0
-                        and (subpath_vector[0] < 0 or subpath_vector[1] < 0)
-                    )
-                    else -1
+                off_y = vector_y + (
+                    1 if (vector_x <= 0 and (vector_x < 0 or vector_y < 0)) else -1
                 )
-                if np.cross(right_constraint, [off_x, off_y]) >= 0:
-                    right_constraint[0] = off_x
-                    right_constraint[1] = off_y
-                off_x = subpath_vector[0] + (
-                    1
-                    if (
-                        subpath_vector[1] <= 0
-                        and (subpath_vector[1] < 0 or subpath_vector[0] < 0)
-                    )
-                    else -1
+                if right_x * off_y - right_y * off_x >= 0:
+                    right_x, right_y = off_x, off_y
+                off_x = vector_x + (
+                    1 if (vector_y <= 0 and (vector_y < 0 or vector_x < 0)) else -1
                 )
-                off_y = subpath_vector[1] + (
-                    1
-                    if (
-                        subpath_vector[0] >= 0
-                        and (subpath_vector[0] > 0 or subpath_vector[1] < 0)
-                    )
-                    else -1
+                off_y = vector_y + (
+                    1 if (vector_x >= 0 and (vector_x > 0 or vector_y < 0)) else -1
                 )
-                if np.cross(left_constraint, [off_x, off_y]) <= 0:
-                    left_constraint[0] = off_x
-                    left_constraint[1] = off_y
+                if left_x * off_y - left_y * off_x <= 0:
+                    left_x, left_y = off_x, off_y
 
             last_corner_index = next_corner_index
             next_corner_index = next_corner[last_corner_index]
-            subpath_vector = compute_vector(path[i], path[next_corner_index])
-            direction = compute_direction(
-                path[last_corner_index], path[next_corner_index]
-            )
+            last_x, last_y = next_x, next_y
+            next_x, next_y = points[next_corner_index]
+            vector_x = next_x - start_x
+            vector_y = next_y - start_y
+            direction = (3 + 3 * _sign(next_x - last_x) + _sign(next_y - last_y)) // 2
             direction_counter[direction] += 1
 
             if not cyclic(next_corner_index, i, last_corner_index):
                 break
 
-        x_direction = np.sign(path[next_corner_index][0] - path[last_corner_index][0])
-        y_direction = np.sign(path[next_corner_index][1] - path[last_corner_index][1])
-        subpath_vector = compute_vector(path[i], path[last_corner_index])
-        direction_vector = (x_direction, y_direction)
+        last_x, last_y = points[last_corner_index]
+        direction_x = _sign(next_x - last_x)
+        direction_y = _sign(next_y - last_y)
+        vector_x = last_x - start_x
+        vector_y = last_y - start_y
 
         # Once we have those 2 corners we can calculate the pivot point
         # between them that forms a straight subpath from the starting point i
@@ -237,16 +230,16 @@ def get_pivot_points(path: list, next_corner: list, path_len: int) -> list:
         #   Where the value j is the distance from the pivot_index to the last point
         # We're looking for a vector V that is containted between the L&R constraints
         # So that:
-        #   np.cross(right_constraint, subpath_vector + pivot_point * direction_vector) >= 0
-        #   np.cross(left_constraint, subpath_vector + pivot_point * direction_vector) <= 0
+        #   cross(right_constraint, subpath_vector + pivot_point * direction_vector) >= 0
+        #   cross(left_constraint, subpath_vector + pivot_point * direction_vector) <= 0
         # The final pivot point = (last_corner_index + j) % path_len
         # And the value j can be calculated from the bilinearity of the cross product as:
 
-        a = np.cross(right_constraint, subpath_vector)
-        b = np.cross(right_constraint, direction_vector)
+        a = right_x * vector_y - right_y * vector_x
+        b = right_x * direction_y - right_y * direction_x
 
-        c = np.cross(left_constraint, subpath_vector)
-        d = np.cross(left_constraint, direction_vector)
+        c = left_x * vector_y - left_y * vector_x
+        d = left_x * direction_y - left_y * direction_x
 
         if b < 0:
             j = a // -b
@@ -273,8 +266,9 @@ def get_longest_straight_subpaths(path: list) -> list:
     path_len = len(path)
     longest_straight_subpaths = [None] * path_len
 
-    next_corner = get_next_corners(path, path_len)
-    pivot_point = get_pivot_points(path, next_corner, path_len)
+    points = np.asarray(path).tolist()
+    next_corner = get_next_corners(points, path_len)
+    pivot_point = get_pivot_points(points, next_corner, path_len)
 
     # Remove the cyclic inaccuracies so that longest_straight_subpaths[i]
     # represents the largest k such that for all i' with i <= i' < k, i' < k <= pivot_point[i'].
@@ -289,13 +283,13 @@ def get_longest_straight_subpaths(path: list) -> list:
     return longest_straight_subpaths
 
 
-def penalty3(path: list, sums: list, i: int, j: int) -> float:
+def penalty3(path: list, sums: np.ndarray, i: int, j: int) -> float:
     """
     Calculate the penalty of an edge from point i to point j in the given path.
 
     Args:
         path (list): List of points representing the path.
-        sums (list): List of precomputed sums used for penalty calculations.
+        sums (np.ndarray): Array of precomputed sums used for penalty calculations, given by `calc_sums`.
         i (int): Starting point index.
         j (int): Ending point index.
 
@@ -310,19 +304,18 @@ def penalty3(path: list, sums: list, i: int, j: int) -> float:
         rotations = 1
 
     if rotations == 0:
-        segment_sum_x = sums[j + 1].x - sums[i].x
-        segment_sum_y = sums[j + 1].y - sums[i].y
-        segment_sum_x2 = sums[j + 1].x2 - sums[i].x2
-        segment_sum_xy = sums[j + 1].xy - sums[i].xy
-        segment_sum_y2 = sums[j + 1].y2 - sums[i].y2
+        segment_sums = sums[j + 1] - sums[i]
         k = j + 1 - i
     else:
-        segment_sum_x = sums[j + 1].x - sums[i].x + sums[path_len].x
-        segment_sum_y = sums[j + 1].y - sums[i].y + sums[path_len].y
-        segment_sum_x2 = sums[j + 1].x2 - sums[i].x2 + sums[path_len].x2
-        segment_sum_xy = sums[j + 1].xy - sums[i].xy + sums[path_len].xy
-        segment_sum_y2 = sums[j + 1].y2 - sums[i].y2 + sums[path_len].y2
+        segment_sums = sums[j + 1] - sums[i] + sums[path_len]
         k = j + 1 - i + path_len
+    (
+        segment_sum_x,
+        segment_sum_y,
+        segment_sum_xy,
+        segment_sum_x2,
+        segment_sum_y2,
+    ) = segment_sums.tolist()
 
     mid_x = (path[i][0] + path[j][0]) / 2.0 - path[0][0]
     mid_y = (path[i][1] + path[j][1]) / 2.0 - path[0][1]
@@ -343,6 +336,55 @@ def penalty3(path: list, sums: list, i: int, j: int) -> float:
     return penalty
 
 
+def penalty3_batch(
+    path: list, sums: np.ndarray, starts: np.ndarray, j: int
+) -> np.ndarray:
+    """
+    Calculate the penalties of the edges from each of the starting points to point j in the given path.
+    Every penalty is computed with the same operations, in the same order, as in `penalty3`.
+
+    Args:
+        path (list): List of points representing the path, or an array of shape (N, 2).
+        sums (np.ndarray): Array of precomputed sums used for penalty calculations, given by `calc_sums`.
+        starts (np.ndarray): Array of starting point indexes.
+        j (int): Ending point index.
+
+    Returns:
+        np.ndarray: Penalty value for each starting point.
+    """
+    points = np.asarray(path)
+    path_len = len(points)
+
+    if j >= path_len:
+        j -= path_len
+        segment_sums = sums[j + 1] - sums[starts] + sums[path_len]
+        k = j + 1 - starts + path_len
+    else:
+        segment_sums = sums[j + 1] - sums[starts]
+        k = j + 1 - starts
+    (
+        segment_sum_x,
+        segment_sum_y,
+        segment_sum_xy,
+        segment_sum_x2,
+        segment_sum_y2,
+    ) = segment_sums.T
+
+    start_points = points[starts]
+    mid_x = (start_points[:, 0] + points[j, 0]) / 2.0 - points[0, 0]
+    mid_y = (start_points[:, 1] + points[j, 1]) / 2.0 - points[0, 1]
+    edge_y = points[j, 0] - start_points[:, 0]
+    edge_x = -(points[j, 1] - start_points[:, 1])
+
+    a = (segment_sum_x2 - 2 * segment_sum_x * mid_x) / k + mid_x * mid_x
+    b = (
+        segment_sum_xy - segment_sum_x * mid_y - segment_sum_y * mid_x
+    ) / k + mid_x * mid_y
+    c = (segment_sum_y2 - 2 * segment_sum_y * mid_y) / k + mid_y * mid_y
+
+    return np.sqrt(edge_x * edge_x * a + 2 * edge_x * edge_y * b + edge_y * edge_y * c)
+
+
 def clip_path_forward(longest_straight_subpaths: list, path_len: int) -> list:
     """
     Calculate the forward clipping path.
@@ -453,11 +495,12 @@ def get_best_polygon(path: list) -> list:
         list: Optimal polygon as a list of point indices.
     """
 
-    path_len = len(path)
-    sums = calc_sums(path)
+    points = np.asarray(path)
+    path_len = len(points)
+    sums = calc_sums(points)
     longest_straight_subpaths = get_longest_straight_subpaths(path)
 
-    penalties = [None] * (path_len + 1)
+    penalties = np.zeros(path_len + 1)
     best_path_vector = [None] * (path_len + 1)
 
     forward_clips = clip_path_forward(
@@ -474,16 +517,18 @@ def get_best_polygon(path: list) -> list:
         backward_clips, segments_num, path_len
     )  # backward segment bounds
 
+    # All candidate predecessors k of i are scored at once, in decreasing order of k,
+    # so that argmin keeps the first of equal penalties like a strict `<` scan would
     penalties[0] = 0
     for j in range(1, segments_num + 1):
         for i in range(seg_bounds_B[j], seg_bounds_F[j] + 1):
-            best = -1
-            for k in range(seg_bounds_F[j - 1], backward_clips[i] - 1, -1):
-                thispen = penalty3(path, sums, k, i) + penalties[k]
-                if best < 0 or thispen < best:
-                    best_path_vector[i] = k
-                    best = thispen
-            penalties[i] = best
+            candidates = np.arange(seg_bounds_F[j - 1], backward_clips[i] - 1, -1)
+            candidate_penalties = (
+                penalty3_batch(points, sums, candidates, i) + penalties[candidates]
+            )
+            best = int(np.argmin(candidate_penalties))
+            best_path_vector[i] = int(candidates[best])
+            penalties[i] = candidate_penalties[best]
 
     polygon = [None] * segments_num
 
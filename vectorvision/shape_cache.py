@@ -0,0 +1,175 @@
+import sys
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+import numpy as np
+
+from vectorvision.path_decomposition import Path
+from vectorvision.vertex_adjustment import _Curve
+
+
+def _shape_key(path) -> tuple[Hashable, tuple[int, int]]:
+    """Split a path into a translation-free fingerprint of its shape and its position
+
+    Args:
+        path: list of points forming path, or a Path
+
+    Returns:
+        Tuple (key, origin) with a hashable fingerprint shared by all translated
+        copies of the path, and the coords of its first point
+    """
+
+    path = path if isinstance(path, Path) else Path(path)
+    try:
+        code = path.to_chain_code()
+        return (code.length, code.steps), (code.x, code.y)
+    except ValueError:
+        points = np.asarray(path, dtype=np.int64)
+        x, y = points[0].tolist()
+        return (points - points[0]).tobytes(), (x, y)
+
+
+def _shift_curve(curve: _Curve, dx: float, dy: float) -> _Curve:
+    """Copy a curve moved by the given offset
+
+    Args:
+        curve: curve to copy
+        dx: offset along the x axis
+        dy: offset along the y axis
+
+    Returns:
+        New curve with all of the points of the given one moved by (dx, dy)
+    """
+
+    shifted = _Curve(len(curve))
+    shifted.tag[:] = curve.tag
+    shifted.c[:] = curve.c + (dx, dy)
+    shifted.vertex[:] = curve.vertex + (dx, dy)
+    shifted.alpha[:] = curve.alpha
+    shifted.alpha0[:] = curve.alpha0
+    shifted.beta[:] = curve.beta
+    shifted.alphacurve = curve.alphacurve
+    return shifted
+
+
+def fit_at_origin(path, fit: Callable[[Path], _Curve]) -> _Curve:
+    """Fit a curve to the path moved to start at the origin, and move it back
+
+    Fitting computes in floating point, so the curve of a path moved by some
+    offset is not exactly the curve of the path moved by the same offset.
+    Fitting every path at the origin makes the curves of all translated copies
+    of a path the same up to their position, which lets ShapeCache reuse them
+    without changing the output.
+
+    Args:
+        path: list of points forming path, or a Path
+        fit: function fitting the curve to a path
+
+    Returns:
+        Curve fitted to the path
+    """
+
+    path = path if isinstance(path, Path) else Path(path)
+    x, y = path.points[0].tolist()
+    return _shift_curve(fit(_moved_to_origin(path, x, y)), x, y)
+
+
+def _moved_to_origin(path: Path, x: int, y: int) -> Path:
+    """Copy a path moved so that the point (x, y) is at the origin
+
+    Args:
+        path: path to copy
+        x: x-coord of the point moved to the origin
+        y: y-coord of the point moved to the origin
+
+    Returns:
+        New path with all of the points moved by (-x, -y)
+    """
+
+    return Path(path.points - (x, y), path.area)
+
+
+def _curve_nbytes(curve: _Curve) -> int:
+    """Estimate the memory held by a curve
+
+    Args:
+        curve: curve to measure
+
+    Returns:
+        Approximate size of the curve and its arrays in bytes
+    """
+
+    return sys.getsizeof(curve) + sum(
+        getattr(curve, name).nbytes
+        for name in ("tag", "c", "vertex", "alpha", "alpha0", "beta")
+    )
+
+
+class ShapeCache:
+    """LRU cache of fitted curves, shared by all translated copies of a path.
+
+    Repeated shapes, like the glyphs of a scanned text, trace to paths that
+    differ only by their position. Curves are fitted like fit_at_origin does,
+    to the path moved to start at the origin, and the fitted curve is kept and
+    moved to the first point of every copy fitted with the same parameters. So
+    the curves are the same as those of fit_at_origin, whether they are found
+    in the cache or not. The least recently used curves are dropped once the
+    cache holds more than max_bytes.
+
+    Attributes:
+        max_bytes (int): memory cap of the cached curves and their keys.
+        nbytes (int): approximate memory held by the cached curves and their keys.
+        hits (int): number of curves reused from the cache.
+        misses (int): number of curves fitted from scratch.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_curve(
+        self, path, fit: Callable[[Path], _Curve], params: Hashable = None
+    ) -> _Curve:
+        """Return the curve fitted to the path, reusing the one of a translated copy
+
+        Args:
+            path: list of points forming path, or a Path
+            fit: function fitting the curve to a path
+            params: fitting parameters of fit, curves are only shared between
+                paths fitted with equal parameters
+
+        Returns:
+            Curve fitted to the path
+        """
+
+        shape, (x, y) = _shape_key(path)
+        key = (params, shape)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return _shift_curve(entry[0], x, y)
+
+        self.misses += 1
+        path = path if isinstance(path, Path) else Path(path)
+        normalized = fit(_moved_to_origin(path, x, y))
+        nbytes = sys.getsizeof(shape) + _curve_nbytes(normalized)
+        if nbytes <= self.max_bytes:
+            self._entries[key] = (normalized, nbytes)
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted_nbytes) = self._entries.popitem(last=False)
+                self.nbytes -= evicted_nbytes
+        return _shift_curve(normalized, x, y)
+
+    def clear(self) -> None:
+        """Remove all of the cached curves"""
+
+        self._entries.clear()
+        self.nbytes = 0
@@ -46,44 +46,65 @@ def calculate_alpha(
     return alpha
 
 
-def smooth(curve: _Curve, alphamax: float) -> None:
-    """
-    Calculate the point which is splitting section into two parts in given proportion
+def calculate_alphas(
+    points0: np.ndarray, points1: np.ndarray, points2: np.ndarray
+) -> np.ndarray:
+    """Calculate the parameter alpha of Bezier curve for many triples of points at once,
+    with the same operations as calculate_alpha
 
     Args:
-        proportion: in which proportion segment should be splitted, ratio ax/ab
-        a: first point
-        b: second point
+        points0: array of starting points
+        points1: array of vertex points
+        points2: array of end points
 
     Returns:
-        point splitting segment ab in given proportion
+        array of values of alpha parameter
     """
 
-    n_of_segments = curve.n
+    side02 = points2 - points0
+    side01 = points1 - points0
+    l1_norm_p0_p2 = np.abs(side02[:, 0]) + np.abs(side02[:, 1])
+    cross_product_p1_p0_p2_p0 = (
+        side01[:, 0] * side02[:, 1] - side01[:, 1] * side02[:, 0]
+    )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factor_of_proportionality = np.abs(cross_product_p1_p0_p2_p0 / l1_norm_p0_p2)
+        gamma = np.where(
+            factor_of_proportionality > 1, 1 - 1.0 / factor_of_proportionality, 0
+        )
+    return np.where(l1_norm_p0_p2 != 0.0, gamma / 0.75, 4 / 3.0)
 
-    for i in range(n_of_segments):
-        j = (i + 1) % n_of_segments
-        k = (i + 2) % n_of_segments
 
-        alpha = calculate_alpha(curve[i].vertex, curve[j].vertex, curve[k].vertex)
-        p4 = interval(1 / 2.0, curve[j].vertex, curve[k].vertex)
+def smooth(curve: _Curve, alphamax: float) -> _Curve:
+    """Mark the corners of the curve and calculate the control points of all of its segments
 
-        if alpha >= alphamax:  # corner found
+    Args:
+        curve: curve with adjusted vertices
+        alphamax: minimum value of alpha for a vertex to be a corner
 
-            curve[j].tag = POTRACE_CORNER
-            curve[j].c[1] = curve[j].vertex
-            curve[j].c[2] = p4
+    Returns:
+        The same curve with tags and control points of the segments
+    """
 
-        else:
-            if alpha < 0.55:
-                alpha = 0.55
-            elif alpha > 1:
-                alpha = 1
-            p2 = interval(0.5 + 0.5 * alpha, curve[i].vertex, curve[j].vertex)
-            p3 = interval(0.5 + 0.5 * alpha, curve[k].vertex, curve[j].vertex)
-            curve[j].tag = POTRACE_CURVETO
-            curve[j].c[0] = p2
-            curve[j].c[1] = p3
-            curve[j].c[2] = p4
+    vertices = curve.vertex
+    prev_vertices = np.roll(vertices, 1, axis=0)
+    next_vertices = np.roll(vertices, -1, axis=0)
+
+    alpha = calculate_alphas(prev_vertices, vertices, next_vertices)
+    corners = alpha >= alphamax
+    curves = ~corners
+
+    # interval(proportion, a, b) for all of the segments
+    p4 = vertices + 1 / 2.0 * (next_vertices - vertices)
+    proportion = (0.5 + 0.5 * np.clip(alpha, 0.55, 1))[:, None]
+    p2 = prev_vertices + proportion * (vertices - prev_vertices)
+    p3 = next_vertices + proportion * (vertices - next_vertices)
+
+    curve.tag[:] = np.where(corners, POTRACE_CORNER, POTRACE_CURVETO)
+    curve.c[corners, 1] = vertices[corners]
+    curve.c[curves, 0] = p2[curves]
+    curve.c[curves, 1] = p3[curves]
+    curve.c[:, 2] = p4
 
     return curve
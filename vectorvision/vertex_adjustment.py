@@ -1,48 +1,159 @@
+from collections import namedtuple
 from numpy.linalg import lstsq
 import numpy as np
-from shapely.geometry import Point, Polygon
-from shapely.ops import nearest_points
 from typing import Optional
+from vectorvision.polygons import calc_sums
+
+Point = namedtuple("Point", ["x", "y"])
 
 
 class _Curve:
+    """Closed curve stored as arrays with one row per segment.
+
+    Indexing the curve gives a _Segment view of a row, so the segments can be
+    read and written one by one as well as through the arrays as a whole.
+
+    Attributes:
+        tag (np.ndarray): int8 array with the tag of every segment.
+        c (np.ndarray): float array of shape (n, 3, 2) with the control points
+            of every segment.
+        vertex (np.ndarray): float array of shape (n, 2) with the vertex of
+            every segment.
+        alpha (np.ndarray): float array with alpha of every segment.
+        alpha0 (np.ndarray): float array with alpha0 of every segment.
+        beta (np.ndarray): float array with beta of every segment.
+        alphacurve (bool): whether alpha has been computed.
+    """
+
+    __slots__ = ("tag", "c", "vertex", "alpha", "alpha0", "beta", "alphacurve")
+
     def __init__(self, m):
-        self.segments = [_Segment() for _ in range(m)]
+        self.tag = np.zeros(m, dtype=np.int8)
+        self.c = np.zeros((m, 3, 2))
+        self.vertex = np.zeros((m, 2))
+        self.alpha = np.zeros(m)
+        self.alpha0 = np.zeros(m)
+        self.beta = np.zeros(m)
         self.alphacurve = False
 
     def __len__(self):
-        return len(self.segments)
+        return len(self.tag)
 
     @property
     def n(self):
         return len(self)
 
+    @property
+    def segments(self):
+        return [_Segment(self, i) for i in range(len(self))]
+
     def __getitem__(self, item):
-        return self.segments[item]
+        n = self.tag.shape[0]
+        if not -n <= item < n:
+            raise IndexError("curve index out of range")
+        return _Segment(self, item % n)
+
+
+class _Point(list):
+    """Point read from a row of an array, writing its items back to the array."""
+
+    __slots__ = ("_array",)
+
+    def __init__(self, array):
+        super().__init__(array.tolist())
+        self._array = array
+
+    def __setitem__(self, item, value):
+        super().__setitem__(item, value)
+        self._array[item] = value
+
+
+class _ControlPoints(list):
+    """Control points of a segment read from an array as tuples, writing the
+    assigned points back to the array."""
+
+    __slots__ = ("_array",)
+
+    def __init__(self, array):
+        super().__init__(map(tuple, array.tolist()))
+        self._array = array
+
+    def __setitem__(self, item, value):
+        super().__setitem__(item, tuple(value))
+        self._array[item] = value
 
 
 class _Segment:
-    def __init__(self):
-        self.tag = 0
-        self.c = [(0, 0), (0, 0), (0, 0)]
-        self.vertex = [0, 0]
-        self.alpha = 0.0
-        self.alpha0 = 0.0
-        self.beta = 0.0
+    """View of one segment of a _Curve."""
+
+    __slots__ = ("_curve", "_index")
+
+    def __init__(self, curve, index):
+        self._curve = curve
+        self._index = index
+
+    @property
+    def tag(self):
+        return self._curve.tag.item(self._index)
+
+    @tag.setter
+    def tag(self, value):
+        self._curve.tag[self._index] = value
+
+    @property
+    def c(self):
+        return _ControlPoints(self._curve.c[self._index])
+
+    @c.setter
+    def c(self, value):
+        self._curve.c[self._index] = value
+
+    @property
+    def vertex(self):
+        return _Point(self._curve.vertex[self._index])
+
+    @vertex.setter
+    def vertex(self, value):
+        self._curve.vertex[self._index] = value
+
+    @property
+    def alpha(self):
+        return self._curve.alpha.item(self._index)
+
+    @alpha.setter
+    def alpha(self, value):
+        self._curve.alpha[self._index] = value
+
+    @property
+    def alpha0(self):
+        return self._curve.alpha0.item(self._index)
+
+    @alpha0.setter
+    def alpha0(self, value):
+        self._curve.alpha0[self._index] = value
+
+    @property
+    def beta(self):
+        return self._curve.beta.item(self._index)
+
+    @beta.setter
+    def beta(self, value):
+        self._curve.beta[self._index] = value
 
 
 def fit_least_squares(points: list[tuple[float, float]]) -> tuple[float, float]:
     """Fit linear function to given points in 2D with least squares method
 
     Args:
-        points: list of points to which straight should be fitted
+        points: list or array of points to which straight should be fitted
 
     Returns:
         Tuple (a, b) with parameters of fitted straight in format y=ax+b
     """
 
-    x = np.array([point[0] for point in points])
-    y = np.array([point[1] for point in points])
+    points = np.asarray(points)
+    x = points[:, 0]
+    y = points[:, 1]
     A = np.vstack([x, np.ones(len(x))]).T
     return lstsq(A, y, rcond=None)[0]
 
@@ -86,41 +197,78 @@ def find_closest_point_in_boundary(
     """
 
     boundary_center_x, boundary_center_y = boundary_center
-    poly = Polygon(
-        [
-            (
-                boundary_center_x + boundary_manhatan_range,
-                boundary_center_y + boundary_manhatan_range,
-            ),
-            (
-                boundary_center_x - boundary_manhatan_range,
-                boundary_center_y + boundary_manhatan_range,
-            ),
-            (
-                boundary_center_x - boundary_manhatan_range,
-                boundary_center_y - boundary_manhatan_range,
-            ),
-            (
-                boundary_center_x + boundary_manhatan_range,
-                boundary_center_y - boundary_manhatan_range,
-            ),
-        ]
+    x, y = original_point
+    return Point(
+        min(
+            max(x, boundary_center_x - boundary_manhatan_range),
+            boundary_center_x + boundary_manhatan_range,
+        ),
+        min(
+            max(y, boundary_center_y - boundary_manhatan_range),
+            boundary_center_y + boundary_manhatan_range,
+        ),
     )
-    point = Point(original_point)
-    p1, _ = nearest_points(poly, point)
-    return p1
 
 
-def adjust_vertices(
-    path: list[tuple[float, float]], polygon_points_idxs: list[int]
-) -> _Curve:
+def fit_edge_lines(
+    path: np.ndarray,
+    sums: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    origins: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Fit a straight to the points of every edge with least squares, in closed form
+
+    The straights are given as y=ax+b, like by fit_least_squares, except for edges
+    made of points with a single x coordinate, which are fitted with x=b.
+
+    Args:
+        path: array of points forming path
+        sums: prefix sums of the path given by calc_sums
+        starts: indexes of the first points of the edges
+        ends: indexes of the last points of the edges, edges with end < start
+            wrap around the end of the path
+        origins: points the coordinates of the straight of every edge are relative to
+
+    Returns:
+        Tuple (a, b, vertical) of arrays, with parameters of the straights and
+        a mask of the straights in format x=b
+    """
+
+    path_len = len(path)
+    wraps = ends < starts
+    counts = ends - starts + 1 + np.where(wraps, path_len, 0)
+    edge_sums = sums[ends + 1] - sums[starts]
+    edge_sums[wraps] += sums[path_len]
+    sum_x, sum_y, sum_xy, sum_x2, _ = edge_sums.T
+
+    # Move the sums from the first point of the path to the origins, so that
+    # they stay small and exact integers
+    dx, dy = (origins - path[0]).astype(np.int64).T
+    sum_x2 = sum_x2 - 2 * dx * sum_x + counts * dx * dx
+    sum_xy = sum_xy - dy * sum_x - dx * sum_y + counts * dx * dy
+    sum_x = sum_x - counts * dx
+    sum_y = sum_y - counts * dy
+
+    variance_x = counts * sum_x2 - sum_x * sum_x
+    covariance = counts * sum_xy - sum_x * sum_y
+    vertical = variance_x == 0
+
+    a = covariance / np.where(vertical, 1, variance_x)
+    b = (sum_y - a * sum_x) / counts
+    a[vertical] = 0.0
+    b[vertical] = sum_x[vertical] / counts[vertical]
+    return a, b, vertical
+
+
+def adjust_vertices(path, polygon_points_idxs: list[int]) -> _Curve:
     """
     Adjust vertices of optimal polygon: calculate the intersection of
      the two "optimal" line segments, then move it into the unit square
      if it lies outside.
 
         Args:
-            path: list of points forming path
+            path: list of points forming path, or a Path
             polygon_points_idxs: list of points indexes in path contained in optimal polygon
 
         Returns:
@@ -128,41 +276,38 @@ def adjust_vertices(
     """
 
     curve = _Curve(len(polygon_points_idxs))
-
-    points = path[polygon_points_idxs[-2] : polygon_points_idxs[-1] + 1]
-    prev_coeff = fit_least_squares(points)
-
-    points = path[polygon_points_idxs[-1] :] + [path[polygon_points_idxs[0]]]
-    coeffs = fit_least_squares(points)
-
-    intersection_point = calculate_intersection_point(coeffs, prev_coeff)
-    if intersection_point is None:
-        intersection_point = (0, 0)
-
-    point_in_boundaries = find_closest_point_in_boundary(
-        intersection_point, path[polygon_points_idxs[-1]], 0.5
+    path = np.asarray(path)
+    sums = calc_sums(path)
+    starts = np.asarray(polygon_points_idxs)
+    ends = np.roll(starts, -1)
+    centers = path[starts]
+
+    # The vertex of segment i is the intersection of edge i and edge i - 1,
+    # computed relative to the path point between them
+    a, b, vertical = fit_edge_lines(path, sums, starts, ends, centers)
+    prev_a, prev_b, prev_vertical = (
+        np.roll(params, 1)
+        for params in fit_edge_lines(path, sums, starts, ends, path[ends])
     )
 
-    curve[-1].vertex[0] = point_in_boundaries.x
-    curve[-1].vertex[1] = point_in_boundaries.y
-    prev_point_idx = polygon_points_idxs[0]
-    prev_coeff = coeffs
-
-    for i, polygon_point in enumerate(polygon_points_idxs[1:]):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = np.where(
+            vertical,
+            b,
+            np.where(prev_vertical, prev_b, (prev_b - b) / (a - prev_a)),
+        )
+        y = np.where(vertical, x * prev_a + prev_b, x * a + b)
 
-        points = path[prev_point_idx : polygon_point + 1]
-        coeffs = fit_least_squares(points)
+    # Parallel straights have no intersection, fall back to the path point
+    # between them, like potrace
+    parallel = np.where(vertical | prev_vertical, vertical & prev_vertical, a == prev_a)
+    x[parallel] = 0
+    y[parallel] = 0
 
-        intersection_point = calculate_intersection_point(coeffs, prev_coeff)
-        if intersection_point is None:
-            intersection_point = (0, 0)
-        point_in_boundaries = find_closest_point_in_boundary(
-            intersection_point, path[prev_point_idx], 0.5
-        )
+    x = np.clip(x, -0.5, 0.5) + centers[:, 0]
+    y = np.clip(y, -0.5, 0.5) + centers[:, 1]
 
-        curve[i].vertex[0] = point_in_boundaries.x
-        curve[i].vertex[1] = point_in_boundaries.y
-        prev_point_idx = polygon_point
-        prev_coeff = coeffs
+    curve.vertex[:, 0] = x
+    curve.vertex[:, 1] = y
 
     return curve